@@ -0,0 +1,11 @@
+import pytest
+from django.test import override_settings
+
+
+@pytest.fixture(autouse=True, scope='session')
+def project_test_settings(tmp_path_factory):
+    # Те же переопределения, что у manage.py test (yatube/test_runner.py).
+    from yatube.test_runner import test_settings
+    directory = str(tmp_path_factory.mktemp('yatube'))
+    with override_settings(**test_settings(directory)):
+        yield
@@ -0,0 +1,60 @@
+from posts.models import Post
+
+# Поля постов и комментариев выбираются через .values() с JOIN
+# по автору и группе: ни объектов моделей, ни запросов на каждую запись.
+POST_FIELDS = (
+    'id', 'text', 'pub_date', 'image', 'comment_count',
+    'author__username', 'author__first_name', 'author__last_name',
+    'group__slug', 'group__title',
+)
+COMMENT_FIELDS = (
+    'id', 'text', 'created',
+    'author__username', 'author__first_name', 'author__last_name',
+)
+
+image_storage = Post._meta.get_field('image').storage
+
+
+def author(row, prefix='author__'):
+    full_name = ' '.join(filter(None, (row[f'{prefix}first_name'],
+                                       row[f'{prefix}last_name'])))
+    return {'username': row[f'{prefix}username'], 'full_name': full_name}
+
+
+def post(row):
+    group = None
+    if row['group__slug'] is not None:
+        group = {'slug': row['group__slug'], 'title': row['group__title']}
+    return {
+        'id': row['id'],
+        'text': row['text'],
+        'pub_date': row['pub_date'],
+        'image': image_storage.url(row['image']) if row['image'] else None,
+        'comment_count': row['comment_count'],
+        'author': author(row),
+        'group': group,
+    }
+
+
+def comment(row):
+    return {
+        'id': row['id'],
+        'text': row['text'],
+        'created': row['created'],
+        'author': author(row),
+    }
+
+
+def group(obj):
+    return {'slug': obj.slug, 'title': obj.title,
+            'description': obj.description}
+
+
+def profile(user):
+    return {
+        'username': user.username,
+        'full_name': user.get_full_name(),
+        'followers_count': user.stats.followers_count,
+        'following_count': user.stats.following_count,
+        'posts_count': user.stats.posts_count,
+    }
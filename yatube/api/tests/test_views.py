@@ -0,0 +1,104 @@
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import Client, TestCase
+from django.urls import reverse
+
+from posts.models import Post, Group, Comment
+from posts.subscriptions import follow
+
+User = get_user_model()
+
+
+class ApiViewsTest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.reader = User.objects.create_user(username='Reader')
+        cls.author = User.objects.create_user(
+            username='Author', first_name='Лев', last_name='Толстой')
+        cls.group = Group.objects.create(
+            title='TestTitle',
+            slug='test-slug',
+            description='TestDescription'
+        )
+        follow(cls.reader, cls.author)
+        cls.posts = [
+            Post.objects.create(text=f'Пост {number}', author=cls.author,
+                                group=cls.group)
+            for number in range(12)
+        ]
+        for number in range(3):
+            Comment.objects.create(post=cls.posts[-1], author=cls.reader,
+                                   text=f'Комментарий {number}')
+
+    def setUp(self):
+        cache.clear()
+        self.guest_client = Client()
+        self.authorized_client = Client()
+        self.authorized_client.force_login(self.reader)
+
+    def test_feeds_run_constant_number_of_queries(self):
+        """Ленты API отдают посты фиксированным числом запросов."""
+        # Сессия и пользователь после первого запроса берутся из кэша.
+        self.authorized_client.get(reverse('api:follow_index'))
+        pages = {
+            reverse('api:index'): (self.guest_client, 1),
+            reverse('api:group_posts', kwargs={'slug': 'test-slug'}): (
+                self.guest_client, 2),
+            reverse('api:profile', kwargs={'username': 'Author'}): (
+                self.guest_client, 2),
+            reverse('api:follow_index'): (self.authorized_client, 2),
+        }
+        for url, (client, queries) in pages.items():
+            with self.subTest(url=url):
+                with self.assertNumQueries(queries):
+                    data = client.get(url).json()
+                self.assertEqual(len(data['results']), 10)
+                self.assertEqual(data['results'][0]['text'], 'Пост 11')
+                self.assertEqual(data['results'][0]['comment_count'], 3)
+                self.assertEqual(data['results'][0]['author'], {
+                    'username': 'Author', 'full_name': 'Лев Толстой'})
+                self.assertEqual(data['results'][0]['group']['slug'],
+                                 'test-slug')
+
+    def test_next_page_by_cursor(self):
+        """Ссылка next ведёт на следующую страницу ленты."""
+        data = self.guest_client.get(reverse('api:index')).json()
+        data = self.guest_client.get(data['next']).json()
+        self.assertEqual([post['text'] for post in data['results']],
+                         ['Пост 1', 'Пост 0'])
+        self.assertIsNone(data['next'])
+        self.assertIsNotNone(data['previous'])
+
+    def test_post_with_comments(self):
+        """Пост отдаётся вместе с первой порцией комментариев."""
+        post = self.posts[-1]
+        with self.assertNumQueries(2):
+            data = self.guest_client.get(
+                reverse('api:post', kwargs={'post_id': post.id})).json()
+        self.assertEqual(data['post']['id'], post.id)
+        self.assertEqual(
+            [comment['text'] for comment in data['comments']['results']],
+            ['Комментарий 2', 'Комментарий 1', 'Комментарий 0'])
+
+    def test_errors(self):
+        """Неизвестные ресурсы и анонимная лента подписок — ошибки JSON."""
+        response = self.guest_client.get(
+            reverse('api:profile', kwargs={'username': 'nobody'}))
+        self.assertEqual(response.status_code, 404)
+        response = self.guest_client.get(reverse('api:follow_index'))
+        self.assertEqual(response.status_code, 401)
+        self.assertIn('detail', response.json())
+
+    def test_errors_have_no_validators(self):
+        """ETag и Cache-Control страницы не достаются ответам 404 и 401."""
+        for url in (reverse('api:profile', kwargs={'username': 'nobody'}),
+                    reverse('api:follow_index')):
+            with self.subTest(url=url):
+                response = self.guest_client.get(url)
+                self.assertFalse(response.has_header('ETag'))
+                self.assertFalse(response.has_header('Last-Modified'))
+                self.assertFalse(response.has_header('Cache-Control'))
+        response = self.guest_client.get(reverse('api:index'))
+        self.assertTrue(response.has_header('ETag'))
+        self.assertIn('no-cache', response['Cache-Control'])
@@ -0,0 +1,89 @@
+from django.contrib.auth import get_user_model
+from django.http import JsonResponse
+
+from posts.conditional import conditional_page
+from posts.models import Post, Group, Comment, TimelineEntry
+from posts.paginator import COMMENTS_PER_PAGE, paginate
+from posts.stats import get_stats
+
+from . import serializers
+from .serializers import COMMENT_FIELDS, POST_FIELDS
+
+User = get_user_model()
+
+
+def json_response(data, status=200):
+    return JsonResponse(data, status=status,
+                        json_dumps_params={'ensure_ascii': False})
+
+
+def not_found():
+    return json_response({'detail': 'Не найдено.'}, status=404)
+
+
+def page_data(request, page, serialize):
+    def link(cursor):
+        return f'{request.path}?cursor={cursor}' if cursor else None
+    return {
+        'results': [serialize(row) for row in page],
+        'next': link(page.next_cursor),
+        'previous': link(page.previous_cursor),
+    }
+
+
+def post_rows(queryset):
+    return queryset.with_related().values(*POST_FIELDS)
+
+
+@conditional_page
+def index(request):
+    page = paginate(request, post_rows(Post.objects.all()))
+    return json_response(page_data(request, page, serializers.post))
+
+
+@conditional_page
+def group_posts(request, slug):
+    group = Group.objects.filter(slug=slug).first()
+    if group is None:
+        return not_found()
+    page = paginate(request, post_rows(group.posts.all()))
+    return json_response({'group': serializers.group(group),
+                          **page_data(request, page, serializers.post)})
+
+
+@conditional_page
+def profile(request, username):
+    user = User.objects.select_related('stats').filter(
+        username=username).first()
+    if user is None:
+        return not_found()
+    get_stats(user)
+    page = paginate(request, post_rows(user.posts.all()))
+    return json_response({'profile': serializers.profile(user),
+                          **page_data(request, page, serializers.post)})
+
+
+@conditional_page
+def follow_index(request):
+    if not request.user.is_authenticated:
+        return json_response({'detail': 'Нужна авторизация.'}, status=401)
+    page = paginate(request, TimelineEntry.objects.filter(user=request.user))
+    post_ids = [entry.post_id for entry in page.object_list]
+    posts = {row['id']: row
+             for row in post_rows(Post.objects.filter(id__in=post_ids))}
+    page.object_list = [posts[post_id] for post_id in post_ids
+                        if post_id in posts]
+    return json_response(page_data(request, page, serializers.post))
+
+
+@conditional_page
+def post_view(request, post_id):
+    row = post_rows(Post.objects.filter(id=post_id)).first()
+    if row is None:
+        return not_found()
+    comments = Comment.objects.filter(post_id=post_id).values(
+        *COMMENT_FIELDS)
+    page = paginate(request, comments, COMMENTS_PER_PAGE, field='created')
+    return json_response({'post': serializers.post(row),
+                          'comments': page_data(request, page,
+                                                serializers.comment)})
@@ -0,0 +1,60 @@
+from .metrics import registry
+
+
+def _labels(**labels):
+    def escape(value):
+        return (str(value).replace('\\', r'\\').replace('"', r'\"')
+                .replace('\n', r'\n'))
+    return ','.join(f'{name}="{escape(value)}"'
+                    for name, value in labels.items())
+
+
+def _histogram(lines, name, help_text, histograms):
+    lines.append(f'# HELP {name} {help_text}')
+    lines.append(f'# TYPE {name} histogram')
+    for view, histogram in sorted(histograms.items()):
+        total = 0
+        bounds = [*map(str, histogram.buckets), '+Inf']
+        for bound, count in zip(bounds, histogram.counts):
+            total += count
+            lines.append(
+                f'{name}_bucket{{{_labels(view=view, le=bound)}}} {total}')
+        lines.append(f'{name}_sum{{{_labels(view=view)}}} {histogram.sum}')
+        lines.append(
+            f'{name}_count{{{_labels(view=view)}}} {histogram.count}')
+
+
+def _counter(lines, name, help_text, samples):
+    lines.append(f'# HELP {name} {help_text}')
+    lines.append(f'# TYPE {name} counter')
+    for labels, value in samples:
+        lines.append(f'{name}{{{_labels(**labels)}}} {value}')
+
+
+def render_metrics():
+    """Метрики всех процессов в текстовом формате Prometheus 0.0.4."""
+    snapshot = registry.collect()
+    lines = []
+    _histogram(lines, 'yatube_request_duration_seconds',
+               'Время ответа view.', snapshot['latency'])
+    _histogram(lines, 'yatube_db_queries_per_request',
+               'Число SQL-запросов за один ответ view.',
+               snapshot['queries'])
+    _counter(lines, 'yatube_responses_total', 'Ответы по кодам статуса.',
+             [({'view': view, 'status': status}, count)
+              for (view, status), count
+              in sorted(snapshot['responses'].items())])
+    _counter(lines, 'yatube_db_query_seconds_total',
+             'Суммарное время SQL-запросов view.',
+             [({'view': view}, seconds) for view, seconds
+              in sorted(snapshot['query_seconds'].items())])
+    _counter(lines, 'yatube_template_render_seconds_total',
+             'Суммарное время рендеринга шаблонов view.',
+             [({'view': view}, seconds) for view, seconds
+              in sorted(snapshot['template_seconds'].items())])
+    _counter(lines, 'yatube_cache_requests_total',
+             'Обращения к кэшу страниц ленты.',
+             [({'cache': name, 'result': result}, count)
+              for (name, result), count
+              in sorted(snapshot['cache'].items())])
+    return '\n'.join(lines) + '\n'
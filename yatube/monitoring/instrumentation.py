@@ -0,0 +1,61 @@
+import threading
+import time
+
+from django.template.backends.django import Template
+
+_local = threading.local()
+
+
+class RequestMetrics:
+    """Счётчики одного запроса, которые копятся по ходу его обработки."""
+
+    def __init__(self):
+        self.queries = 0
+        self.query_seconds = 0.0
+        self.template_seconds = 0.0
+        self.template_depth = 0
+
+    def execute(self, execute, sql, params, many, context):
+        # Обёртка для connection.execute_wrapper.
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.query_seconds += time.perf_counter() - started
+            self.queries += 1
+
+
+def start_request():
+    _local.metrics = RequestMetrics()
+    return _local.metrics
+
+
+def finish_request():
+    _local.metrics = None
+
+
+def instrument_templates():
+    """
+    Засекает время рендеринга шаблонов верхнего уровня. Вложенные
+    render() (например, из inclusion-тегов) входят во внешний замер
+    и отдельно не считаются.
+    """
+    render = Template.render
+    if getattr(render, 'instrumented', False):
+        return
+
+    def timed_render(self, context=None, request=None):
+        metrics = getattr(_local, 'metrics', None)
+        if metrics is None:
+            return render(self, context, request)
+        metrics.template_depth += 1
+        started = time.perf_counter()
+        try:
+            return render(self, context, request)
+        finally:
+            metrics.template_depth -= 1
+            if not metrics.template_depth:
+                metrics.template_seconds += time.perf_counter() - started
+
+    timed_render.instrumented = True
+    Template.render = timed_render
@@ -0,0 +1,202 @@
+import bisect
+import json
+import os
+import threading
+import time
+import uuid
+from collections import defaultdict
+
+from django.conf import settings
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+QUERY_COUNT_BUCKETS = (0, 1, 2, 5, 10, 20, 50, 100)
+# Как часто процесс записывает свой снимок метрик в METRICS_DIR.
+FLUSH_INTERVAL = 1
+
+
+class Histogram:
+    def __init__(self, buckets):
+        self.buckets = buckets
+        # Последняя ячейка — значения больше верхней границы (+Inf).
+        self.counts = [0] * (len(buckets) + 1)
+        self.sum = 0
+        self.count = 0
+
+    def observe(self, value):
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+    def merge(self, other):
+        self.counts = [a + b for a, b in zip(self.counts, other.counts)]
+        self.sum += other.sum
+        self.count += other.count
+
+
+class Registry:
+    """
+    Метрики текущего процесса. Запись — несколько сложений под общей
+    блокировкой; вся работа по форматированию делается при выгрузке.
+
+    Воркеры gunicorn отвечают на /metrics/ по очереди, поэтому каждый
+    процесс не чаще раза в FLUSH_INTERVAL пишет свой снимок в отдельный
+    файл METRICS_DIR, а collect() складывает файлы всех процессов.
+    """
+
+    def __init__(self, directory=None):
+        self._directory = directory
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._clear()
+
+    @property
+    def directory(self):
+        return self._directory or settings.METRICS_DIR
+
+    def _clear(self):
+        self.latency = defaultdict(lambda: Histogram(LATENCY_BUCKETS))
+        self.queries = defaultdict(lambda: Histogram(QUERY_COUNT_BUCKETS))
+        self.responses = defaultdict(int)
+        self.query_seconds = defaultdict(float)
+        self.template_seconds = defaultdict(float)
+        self.cache = defaultdict(int)
+        # Файл свой у каждого процесса: после fork потомок начинает
+        # с нуля, счётчики родителя остаются в файле родителя.
+        self._pid = os.getpid()
+        self._name = f'{self._pid}-{uuid.uuid4().hex}.json'
+        self._flushed = time.monotonic()
+
+    def _check_fork(self):
+        if self._pid != os.getpid():
+            self._clear()
+
+    def reset(self):
+        with self._lock:
+            try:
+                os.remove(os.path.join(self.directory, self._name))
+            except FileNotFoundError:
+                pass
+            self._clear()
+
+    def observe_request(self, view, status, seconds, queries, query_seconds,
+                        template_seconds):
+        with self._lock:
+            self._check_fork()
+            self.latency[view].observe(seconds)
+            self.queries[view].observe(queries)
+            self.responses[view, status] += 1
+            self.query_seconds[view] += query_seconds
+            self.template_seconds[view] += template_seconds
+        self._maybe_flush()
+
+    def observe_cache(self, name, hit):
+        with self._lock:
+            self._check_fork()
+            self.cache[name, 'hits' if hit else 'misses'] += 1
+        self._maybe_flush()
+
+    def snapshot(self):
+        with self._lock:
+            self._check_fork()
+            return {
+                'latency': {view: _copy(histogram)
+                            for view, histogram in self.latency.items()},
+                'queries': {view: _copy(histogram)
+                            for view, histogram in self.queries.items()},
+                'responses': dict(self.responses),
+                'query_seconds': dict(self.query_seconds),
+                'template_seconds': dict(self.template_seconds),
+                'cache': dict(self.cache),
+            }
+
+    def _maybe_flush(self):
+        if time.monotonic() - self._flushed >= FLUSH_INTERVAL:
+            self.flush()
+
+    def flush(self):
+        """Записывает снимок процесса в его файл атомарной заменой."""
+        with self._flush_lock:
+            self._flushed = time.monotonic()
+            snapshot = self.snapshot()
+            directory = self.directory
+            os.makedirs(directory, 0o700, exist_ok=True)
+            path = os.path.join(directory, self._name)
+            with open(path + '.tmp', 'w', encoding='utf-8') as stream:
+                json.dump(_dump(snapshot), stream)
+            os.replace(path + '.tmp', path)
+
+    def collect(self):
+        """Сумма метрик всех процессов, писавших в METRICS_DIR."""
+        self.flush()
+        total = _load({})
+        for name in os.listdir(self.directory):
+            if not name.endswith('.json'):
+                continue
+            try:
+                with open(os.path.join(self.directory, name),
+                          encoding='utf-8') as stream:
+                    sample = _load(json.load(stream))
+            except (OSError, ValueError):
+                # Файл удалён между listdir и open или испорчен.
+                continue
+            _merge(total, sample)
+        return total
+
+
+def _copy(histogram):
+    copy = Histogram(histogram.buckets)
+    copy.counts = list(histogram.counts)
+    copy.sum = histogram.sum
+    copy.count = histogram.count
+    return copy
+
+
+def _dump(snapshot):
+    # В JSON ключи — только строки, поэтому пары хранятся списками.
+    return {
+        'latency': {view: [histogram.counts, histogram.sum, histogram.count]
+                    for view, histogram in snapshot['latency'].items()},
+        'queries': {view: [histogram.counts, histogram.sum, histogram.count]
+                    for view, histogram in snapshot['queries'].items()},
+        'responses': [[*key, value]
+                      for key, value in snapshot['responses'].items()],
+        'query_seconds': snapshot['query_seconds'],
+        'template_seconds': snapshot['template_seconds'],
+        'cache': [[*key, value] for key, value in snapshot['cache'].items()],
+    }
+
+
+def _histograms(data, buckets):
+    histograms = {}
+    for view, (counts, total, count) in data.items():
+        histogram = histograms[view] = Histogram(buckets)
+        histogram.counts, histogram.sum, histogram.count = counts, total, count
+    return histograms
+
+
+def _load(data):
+    return {
+        'latency': _histograms(data.get('latency', {}), LATENCY_BUCKETS),
+        'queries': _histograms(data.get('queries', {}), QUERY_COUNT_BUCKETS),
+        'responses': {(view, status): value
+                      for view, status, value in data.get('responses', [])},
+        'query_seconds': dict(data.get('query_seconds', {})),
+        'template_seconds': dict(data.get('template_seconds', {})),
+        'cache': {(name, result): value
+                  for name, result, value in data.get('cache', [])},
+    }
+
+
+def _merge(total, sample):
+    for kind in ('latency', 'queries'):
+        for view, histogram in sample[kind].items():
+            if view in total[kind]:
+                total[kind][view].merge(histogram)
+            else:
+                total[kind][view] = histogram
+    for kind in ('responses', 'query_seconds', 'template_seconds', 'cache'):
+        for key, value in sample[kind].items():
+            total[kind][key] = total[kind].get(key, 0) + value
+
+
+registry = Registry()
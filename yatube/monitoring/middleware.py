@@ -0,0 +1,36 @@
+import time
+from contextlib import ExitStack
+
+from django.db import connections
+
+from .instrumentation import finish_request, start_request
+from .metrics import registry
+
+
+class MetricsMiddleware:
+    """
+    Замеряет время ответа, число и время SQL-запросов и время
+    рендеринга шаблонов для каждого view. Должен стоять первым
+    в MIDDLEWARE, чтобы замер включал остальные middleware.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        metrics = start_request()
+        started = time.perf_counter()
+        try:
+            with ExitStack() as stack:
+                for connection in connections.all():
+                    stack.enter_context(
+                        connection.execute_wrapper(metrics.execute))
+                response = self.get_response(request)
+        finally:
+            finish_request()
+        match = request.resolver_match
+        view = match.view_name if match else '<unresolved>'
+        registry.observe_request(
+            view, response.status_code, time.perf_counter() - started,
+            metrics.queries, metrics.query_seconds, metrics.template_seconds)
+        return response
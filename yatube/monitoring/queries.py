@@ -0,0 +1,146 @@
+import functools
+import logging
+import os
+import re
+import sys
+from collections import Counter
+
+from django.conf import settings
+from django.db import connections
+
+logger = logging.getLogger(__name__)
+
+IN_LIST = re.compile(r'IN \((?:%s, )*%s\)')
+SPACES = re.compile(r'\s+')
+# Начало транзакции и точки сохранения (во вложенных atomic, в тестах
+# они вложены в транзакцию теста) данных не читают — их не считаем.
+TRANSACTION_CONTROL = ('BEGIN', 'SAVEPOINT', 'RELEASE SAVEPOINT',
+                       'ROLLBACK TO SAVEPOINT')
+THIS_FILE = os.path.abspath(__file__)
+
+
+class QueryProblem(Exception):
+    """Запрос view нарушил правила, заданные для режима 'raise'."""
+
+
+class NPlusOneDetected(QueryProblem):
+    pass
+
+
+class QueryBudgetExceeded(QueryProblem):
+    pass
+
+
+def report(error):
+    mode = settings.QUERY_CHECKS
+    if mode == 'raise':
+        raise error
+    if mode == 'log':
+        logger.warning('%s', error)
+
+
+def shape(sql):
+    """Форма запроса: параметры уже вынесены, схлопываем списки IN."""
+    return SPACES.sub(' ', IN_LIST.sub('IN (...)', sql))
+
+
+def origin():
+    """
+    Откуда выполнен запрос: строка шаблона, если запрос сделан при
+    рендеринге, иначе ближайшая строка кода проекта.
+    """
+    frame = sys._getframe(1)
+    fallback = None
+    while frame is not None:
+        node = frame.f_locals.get('self')
+        if (frame.f_code.co_name == 'render_annotated'
+                and getattr(node, 'token', None) is not None):
+            name = node.origin.template_name or node.origin.name
+            return f'{name}:{node.token.lineno}'
+        filename = frame.f_code.co_filename
+        if (fallback is None and filename != THIS_FILE
+                and filename.startswith(settings.BASE_DIR)
+                and 'site-packages' not in filename):
+            fallback = f'{filename}:{frame.f_lineno}'
+        frame = frame.f_back
+    return fallback or '<неизвестно>'
+
+
+class QueryCounter:
+    """Считает запросы в контексте, подключаясь ко всем соединениям."""
+
+    def __init__(self):
+        self.total = 0
+        self.shapes = Counter()
+        self.origins = {}
+
+    def __call__(self, execute, sql, params, many, context):
+        if sql.startswith(TRANSACTION_CONTROL):
+            return execute(sql, params, many, context)
+        self.total += 1
+        key = shape(sql)
+        self.shapes[key] += 1
+        # Стек разбираем один раз на форму, когда она начала повторяться.
+        if self.shapes[key] == settings.NPLUSONE_THRESHOLD:
+            self.origins[key] = origin()
+        return execute(sql, params, many, context)
+
+    def __enter__(self):
+        self._wrappers = [connection.execute_wrapper(self)
+                          for connection in connections.all()]
+        for wrapper in self._wrappers:
+            wrapper.__enter__()
+        return self
+
+    def __exit__(self, *exc_info):
+        for wrapper in reversed(self._wrappers):
+            wrapper.__exit__(*exc_info)
+
+    def repeated(self):
+        return [(key, count, self.origins[key])
+                for key, count in self.shapes.items()
+                if count >= settings.NPLUSONE_THRESHOLD]
+
+
+class NPlusOneMiddleware:
+    """
+    Ищет N+1: запрос одной формы, повторённый в одном ответе
+    NPLUSONE_THRESHOLD раз и больше. В режиме 'log' пишет в лог
+    шаблон и строку, откуда он выполнялся, в режиме 'raise' падает.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        if settings.QUERY_CHECKS == 'off':
+            return self.get_response(request)
+        with QueryCounter() as counter:
+            response = self.get_response(request)
+        for sql, count, where in counter.repeated():
+            report(NPlusOneDetected(
+                f'{request.path}: {count} одинаковых запросов из {where}: '
+                f'{sql}'))
+        return response
+
+
+def query_budget(limit):
+    """
+    Ограничивает число запросов view, включая чтение сессии
+    и пользователя. Объявляется рядом с маршрутом в urls.py.
+    """
+    def decorator(view):
+        @functools.wraps(view)
+        def wrapper(request, *args, **kwargs):
+            if settings.QUERY_CHECKS == 'off':
+                return view(request, *args, **kwargs)
+            with QueryCounter() as counter:
+                response = view(request, *args, **kwargs)
+            if counter.total > limit:
+                report(QueryBudgetExceeded(
+                    f'{request.path}: {counter.total} запросов '
+                    f'при бюджете {limit}'))
+            return response
+        wrapper.query_budget = limit
+        return wrapper
+    return decorator
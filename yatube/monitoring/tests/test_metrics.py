@@ -0,0 +1,77 @@
+import re
+import shutil
+import tempfile
+from unittest import mock
+
+from django.core.cache import cache
+from django.test import Client, TestCase
+from django.urls import reverse
+
+from monitoring.metrics import Registry, registry
+
+
+class MetricsTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        registry.reset()
+        self.guest_client = Client()
+
+    def sample(self, text, name, **labels):
+        label_text = ','.join(f'{key}="{value}"'
+                              for key, value in labels.items())
+        match = re.search(
+            rf'^{name}{{{re.escape(label_text)}}} (\S+)$', text, re.M)
+        self.assertIsNotNone(match, f'{name}{{{label_text}}} не найдена')
+        return float(match.group(1))
+
+    def test_views_are_measured(self):
+        """Метрики содержат время ответа, SQL, шаблоны и кэш по view."""
+        for _ in range(2):
+            self.guest_client.get(reverse('index'))
+        text = self.guest_client.get(
+            reverse('monitoring:metrics')).content.decode()
+        self.assertEqual(self.sample(
+            text, 'yatube_request_duration_seconds_count', view='index'), 2)
+        self.assertEqual(self.sample(
+            text, 'yatube_request_duration_seconds_bucket',
+            view='index', le='+Inf'), 2)
+        self.assertEqual(self.sample(
+            text, 'yatube_responses_total', view='index', status=200), 2)
+        # Вторая страница пришла из кэша ленты без запроса к постам.
+        self.assertEqual(self.sample(
+            text, 'yatube_db_queries_per_request_sum', view='index'), 1)
+        self.assertGreater(self.sample(
+            text, 'yatube_template_render_seconds_total', view='index'), 0)
+        self.assertGreaterEqual(self.sample(
+            text, 'yatube_cache_requests_total',
+            cache='feed', result='hits'), 1)
+
+    def test_metrics_are_internal(self):
+        """Метрики не отдаются с внешних адресов."""
+        response = self.guest_client.get(reverse('monitoring:metrics'),
+                                         REMOTE_ADDR='203.0.113.5')
+        self.assertEqual(response.status_code, 404)
+
+    def test_scrape_sums_all_workers(self):
+        """Любой воркер отдаёт на /metrics/ сумму метрик всех воркеров."""
+        directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, directory, ignore_errors=True)
+        workers = [Registry(directory), Registry(directory)]
+        for worker in workers:
+            with mock.patch('monitoring.middleware.registry', worker):
+                self.guest_client.get(reverse('about:author'))
+            worker.observe_cache('feed', hit=True)
+            worker.flush()
+        for worker in workers:
+            with mock.patch('monitoring.exposition.registry', worker):
+                text = self.guest_client.get(
+                    reverse('monitoring:metrics')).content.decode()
+            self.assertEqual(self.sample(
+                text, 'yatube_request_duration_seconds_count',
+                view='about:author'), 2)
+            self.assertEqual(self.sample(
+                text, 'yatube_responses_total',
+                view='about:author', status=200), 2)
+            self.assertEqual(self.sample(
+                text, 'yatube_cache_requests_total',
+                cache='feed', result='hits'), 2)
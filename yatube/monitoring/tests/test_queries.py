@@ -0,0 +1,65 @@
+from django.contrib.auth import get_user_model
+from django.http import HttpResponse
+from django.template import Context, Template
+from django.test import RequestFactory, TestCase, override_settings
+
+from monitoring.queries import (NPlusOneDetected, NPlusOneMiddleware,
+                                QueryBudgetExceeded, query_budget)
+from posts import urls
+from posts.models import Post
+
+User = get_user_model()
+
+TEMPLATE = """{% for post in posts %}
+{{ post.author.username }}{% endfor %}"""
+
+
+def n_plus_one_view(request):
+    posts = Post.objects.all()
+    return HttpResponse(Template(TEMPLATE).render(Context({'posts': posts})))
+
+
+class QueryChecksTest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        for number in range(3):
+            author = User.objects.create_user(username=f'Author{number}')
+            Post.objects.create(text='Пост', author=author)
+
+    def setUp(self):
+        self.request = RequestFactory().get('/feed/')
+
+    def test_n_plus_one_raises_with_template_line(self):
+        """Повторяющийся запрос из шаблона указывает на его строку."""
+        middleware = NPlusOneMiddleware(n_plus_one_view)
+        with self.assertRaisesMessage(NPlusOneDetected,
+                                      '3 одинаковых запросов из '
+                                      '<unknown source>:2'):
+            middleware(self.request)
+
+    @override_settings(QUERY_CHECKS='log')
+    def test_n_plus_one_logged(self):
+        """В режиме 'log' N+1 пишется в лог, а ответ отдаётся."""
+        middleware = NPlusOneMiddleware(n_plus_one_view)
+        with self.assertLogs('monitoring.queries', 'WARNING') as logs:
+            response = middleware(self.request)
+        self.assertEqual(response.status_code, 200)
+        self.assertIn('/feed/', logs.output[0])
+
+    def test_query_budget(self):
+        """View, превысивший бюджет запросов, падает в режиме 'raise'."""
+        def view(request):
+            return HttpResponse(str(Post.objects.count()))
+        self.assertEqual(query_budget(1)(view)(self.request).status_code,
+                         200)
+        with self.assertRaises(QueryBudgetExceeded):
+            query_budget(0)(view)(self.request)
+
+    def test_posts_routes_declare_budgets(self):
+        """У каждой страницы posts.urls, кроме ошибок, есть бюджет."""
+        for pattern in urls.urlpatterns:
+            if pattern.name in ('404', '500'):
+                continue
+            with self.subTest(name=pattern.name):
+                self.assertTrue(hasattr(pattern.callback, 'query_budget'))
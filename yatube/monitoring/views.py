@@ -0,0 +1,12 @@
+from django.conf import settings
+from django.http import Http404, HttpResponse
+
+from .exposition import render_metrics
+
+
+def metrics(request):
+    # Метрики доступны только с адресов из INTERNAL_IPS.
+    if request.META.get('REMOTE_ADDR') not in settings.INTERNAL_IPS:
+        raise Http404
+    return HttpResponse(render_metrics(),
+                        content_type='text/plain; version=0.0.4')
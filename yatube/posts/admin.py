@@ -1,5 +1,6 @@
 from django.contrib import admin
 from .models import Post, Group, Follow
+from .search import matching_ids, to_match_query
 
 
 class PostAdmin(admin.ModelAdmin):
@@ -8,6 +9,14 @@ class PostAdmin(admin.ModelAdmin):
     list_filter = ("pub_date",)
     empty_value_display = "-пусто-"
 
+    # Поиск по тексту идёт через индекс FTS5, а не LIKE по всей таблице.
+    def get_search_results(self, request, queryset, search_term):
+        if not search_term:
+            return queryset, False
+        if to_match_query(search_term) is None:
+            return queryset.none(), False
+        return queryset.filter(pk__in=matching_ids(search_term)), False
+
 
 class GroupAdmin(admin.ModelAdmin):
     list_display = ("pk", "title", "slug", "description")
@@ -0,0 +1,37 @@
+from django.core.management.color import no_style
+from django.db import connections
+from django.db.models.sql import InsertQuery
+
+
+def insert(model, objs, batch_size=1000, using='default',
+           ignore_conflicts=False):
+    """
+    Вставляет объекты пачками, как loaddata, но без save() и сигналов.
+
+    raw=True сохраняет значения полей как есть, в том числе pk и даты
+    auto_now_add, которые bulk_create перезаписал бы текущим временем.
+    Возвращает число вставленных строк: с ignore_conflicts строки
+    с занятым ключом база пропускает.
+    """
+    connection = connections[using]
+    fields = model._meta.concrete_fields
+    size = min(batch_size, connection.ops.bulk_batch_size(fields, objs))
+    inserted = 0
+    with connection.cursor() as cursor:
+        for start in range(0, len(objs), size):
+            query = InsertQuery(model, ignore_conflicts=ignore_conflicts)
+            query.insert_values(fields, objs[start:start + size], raw=True)
+            for sql, params in query.get_compiler(using=using).as_sql():
+                cursor.execute(sql, params)
+                inserted += cursor.rowcount
+    return inserted
+
+
+def reset_sequences(models, using='default'):
+    """Сдвигает счётчики автоинкремента за вставленные вручную pk."""
+    connection = connections[using]
+    statements = connection.ops.sequence_reset_sql(no_style(), models)
+    if statements:
+        with connection.cursor() as cursor:
+            for statement in statements:
+                cursor.execute(statement)
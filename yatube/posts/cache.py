@@ -0,0 +1,118 @@
+import datetime as dt
+import hashlib
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+
+from monitoring.metrics import registry
+
+FEED_VERSION_KEY = 'posts:feed:version'
+FEED_MODIFIED_KEY = 'posts:feed:modified'
+FOLLOW_VERSION_KEY = 'posts:follow:version'
+
+
+def record(name, hit):
+    registry.observe_cache(name, hit)
+
+
+def cache_stats():
+    """Счётчики попаданий и промахов кэша во всех процессах."""
+    return registry.collect()['cache']
+
+
+def _version(key):
+    version = cache.get(key)
+    if version is None:
+        # Начинаем отсчёт с текущего времени, чтобы после вытеснения
+        # ключа версия не совпала ни с одной из уже выданных.
+        cache.add(key, int(time.time() * 1000), timeout=None)
+        version = cache.get(key)
+    return version
+
+
+def _incr(key):
+    try:
+        cache.incr(key)
+    except ValueError:
+        _version(key)
+
+
+def _bump(key):
+    _incr(key)
+    # Пока транзакция не закоммичена, параллельный запрос может
+    # закэшировать старые данные под новой версией — повторяем сдвиг
+    # после коммита.
+    transaction.on_commit(lambda: _incr(key))
+
+
+def feed_version():
+    return _version(FEED_VERSION_KEY)
+
+
+def _touch_feed():
+    cache.set(FEED_MODIFIED_KEY, int(time.time()), timeout=None)
+
+
+def bump_feed_version():
+    _bump(FEED_VERSION_KEY)
+    _touch_feed()
+    transaction.on_commit(_touch_feed)
+
+
+def feed_modified():
+    """Время последнего изменения лент или None, если оно неизвестно."""
+    timestamp = cache.get(FEED_MODIFIED_KEY)
+    if timestamp is None:
+        return None
+    return dt.datetime.fromtimestamp(timestamp, dt.timezone.utc)
+
+
+def follow_version():
+    return _version(FOLLOW_VERSION_KEY)
+
+
+def bump_follow_version():
+    _bump(FOLLOW_VERSION_KEY)
+
+
+def post_version_key(pk):
+    return f'posts:post:{pk}:version'
+
+
+def group_version_key(pk):
+    return f'posts:group:{pk}:version'
+
+
+def versions(keys):
+    """Текущие версии нескольких ключей за одно обращение к кэшу."""
+    found = cache.get_many(keys)
+    return {key: found[key] if key in found else _version(key)
+            for key in keys}
+
+
+def bump_post_version(pk):
+    _bump(post_version_key(pk))
+
+
+def bump_group_version(pk):
+    _bump(group_version_key(pk))
+
+
+def cached_feed_page(name, cursor, build_page):
+    """
+    Возвращает страницу ленты из кэша или строит её через build_page.
+
+    Ключ содержит версию ленты, поэтому любая запись (пост, правка,
+    удаление, комментарий) делает все закэшированные страницы
+    недоступными, и читатель никогда не видит устаревшую ленту.
+    """
+    cursor_hash = hashlib.md5((cursor or '').encode()).hexdigest()
+    key = f'posts:feed:{feed_version()}:{name}:{cursor_hash}'
+    page = cache.get(key)
+    record('feed', page is not None)
+    if page is None:
+        page = build_page()
+        cache.set(key, page, settings.FEED_CACHE_TIMEOUT)
+    return page
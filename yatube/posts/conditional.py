@@ -0,0 +1,59 @@
+import functools
+import hashlib
+import time
+
+from django.conf import settings
+from django.utils.cache import patch_cache_control
+from django.views.decorators.http import condition
+
+from .cache import feed_modified, feed_version, follow_version
+
+
+def page_etag(request, *args, **kwargs):
+    """
+    ETag страницы без запросов к постам: версии лент и подписок из кэша
+    меняются при любой записи, которая видна на странице, а адрес,
+    пользователь и CSRF-кука отличают разные варианты страницы.
+    """
+    parts = (feed_version(), follow_version(), request.get_full_path(),
+             request.user.pk,
+             request.COOKIES.get(settings.CSRF_COOKIE_NAME))
+    return hashlib.md5(repr(parts).encode()).hexdigest()
+
+
+def page_last_modified(request, *args, **kwargs):
+    # Дата изменения не учитывает, кто смотрит страницу, поэтому
+    # отдаём её только анонимам; остальным хватает ETag.
+    if request.user.is_authenticated:
+        return None
+    modified = feed_modified()
+    # Точность Last-Modified — секунда: запись в ту же секунду его
+    # не сдвинет, и браузер получил бы 304 со старой страницей.
+    # Пока секунда не закончилась, полагаемся только на ETag.
+    if modified is None or modified.timestamp() >= int(time.time()):
+        return None
+    return modified
+
+
+def conditional_page(view):
+    """
+    Отвечает 304 Not Modified, если страница не менялась с прошлого
+    визита, не выполняя view. no-cache заставляет браузер каждый раз
+    проверять страницу, а не показывать её из кэша по эвристике.
+    """
+    conditional = condition(etag_func=page_etag,
+                            last_modified_func=page_last_modified)(view)
+
+    @functools.wraps(view)
+    def wrapper(request, *args, **kwargs):
+        response = conditional(request, *args, **kwargs)
+        if response.status_code in (200, 304):
+            patch_cache_control(response, private=True, no_cache=True)
+        else:
+            # Валидаторы описывают страницу, а не ответ 404 или 401:
+            # браузер не должен перепроверять по ним ошибку.
+            for header in ('ETag', 'Last-Modified'):
+                if response.has_header(header):
+                    del response[header]
+        return response
+    return wrapper
@@ -0,0 +1,50 @@
+import functools
+import logging
+import time
+
+from django.db import OperationalError, transaction
+
+logger = logging.getLogger(__name__)
+
+ATTEMPTS = 4
+DELAY = 0.05
+LOCKED = ('database is locked', 'database table is locked')
+
+
+def is_locked(error):
+    return str(error).startswith(LOCKED)
+
+
+def retry_on_locked(view):
+    """
+    Выполняет view в одной транзакции и повторяет его, если SQLite
+    ответил «database is locked».
+
+    Транзакция отложенная: блокировка записи берётся только на первой
+    записи. Если к этому моменту другой писатель уже закоммитил свои
+    изменения, SQLite не ждёт (busy timeout не помогает), а сразу
+    возвращает ошибку. Поэтому весь view повторяется с новым снимком
+    базы; до коммита в базу ничего не записано, так что повтор
+    безопасен — разве что версии в кэше лишний раз сбросятся.
+    Загруженные файлы первая попытка уже прочитала, перед повтором
+    они перематываются в начало.
+    """
+    @functools.wraps(view)
+    def wrapper(request, *args, **kwargs):
+        # Во внешней транзакции повтор бесполезен: откатится и она.
+        if transaction.get_connection().in_atomic_block:
+            return view(request, *args, **kwargs)
+        for attempt in range(1, ATTEMPTS + 1):
+            for _, uploads in request.FILES.lists():
+                for upload in uploads:
+                    upload.seek(0)
+            try:
+                with transaction.atomic():
+                    return view(request, *args, **kwargs)
+            except OperationalError as error:
+                if attempt == ATTEMPTS or not is_locked(error):
+                    raise
+                logger.info('%s: база занята, попытка %d', request.path,
+                            attempt)
+                time.sleep(DELAY * 2 ** (attempt - 1))
+    return wrapper
@@ -1,4 +1,7 @@
 from django import forms
+from django.core.files.uploadedfile import UploadedFile
+
+from . import images
 from .models import Post, Comment
 
 
@@ -13,6 +16,13 @@ class PostForm(forms.ModelForm):
             'text': 'Введите текст',
             'group': 'Выберите сообщество (необязательно)', }
 
+    def clean_image(self):
+        image = self.cleaned_data['image']
+        # При правке без новой картинки здесь уже сохранённый файл.
+        if isinstance(image, UploadedFile):
+            return images.normalize(image)
+        return image
+
 
 class CommentForm(forms.ModelForm):
     class Meta:
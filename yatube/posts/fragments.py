@@ -0,0 +1,83 @@
+import json
+import re
+
+from django.template.loader import render_to_string
+from django.utils.safestring import mark_safe
+
+from .models import Follow
+
+MARKER = re.compile(r'<!--fragment:(\w+):(\{.*?\})-->')
+# Чтобы аргументы в JSON не закрыли HTML-комментарий раньше времени.
+JSON_ESCAPES = {ord('<'): '\\u003c', ord('>'): '\\u003e', ord('&'): '\\u0026'}
+
+FRAGMENTS = {}
+
+
+def fragment(name):
+    """
+    Регистрирует фрагмент страницы, зависящий от пользователя.
+    Функция получает запрос и простые аргументы, которые можно
+    сохранить в JSON, и возвращает HTML.
+    """
+    def decorator(render):
+        FRAGMENTS[name] = render
+        return render
+    return decorator
+
+
+def is_skeleton(request):
+    return getattr(request, 'page_skeleton', False)
+
+
+def marker(name, **kwargs):
+    arguments = json.dumps(kwargs, sort_keys=True).translate(JSON_ESCAPES)
+    return mark_safe(f'<!--fragment:{name}:{arguments}-->')
+
+
+def render(request, name, **kwargs):
+    """
+    HTML фрагмента для этого запроса, а при рендеринге каркаса
+    страницы — метка, вместо которой fill() подставит фрагмент.
+    """
+    if is_skeleton(request):
+        return marker(name, **kwargs)
+    return mark_safe(FRAGMENTS[name](request, **kwargs))
+
+
+def fill(request, skeleton):
+    """Подставляет в каркас фрагменты текущего пользователя."""
+    return MARKER.sub(
+        lambda match: FRAGMENTS[match[1]](request, **json.loads(match[2])),
+        skeleton)
+
+
+@fragment('nav')
+def nav(request, query=''):
+    return render_to_string('nav.html', {'query': query}, request)
+
+
+@fragment('menu')
+def menu(request, active=None):
+    context = {active: True} if active else {}
+    return render_to_string('includes/menu.html', context, request)
+
+
+@fragment('follow_button')
+def follow_button(request, author_id, username):
+    subscription = (request.user.is_authenticated
+                    and Follow.objects.filter(user=request.user,
+                                              author_id=author_id).exists())
+    return render_to_string('includes/follow_button.html', {
+        'username': username,
+        'subscription': subscription,
+    }, request)
+
+
+@fragment('post_edit_button')
+def post_edit_button(request, post_id, author_id, username):
+    if request.user.pk != author_id:
+        return ''
+    return render_to_string('includes/post_edit_button.html', {
+        'post_id': post_id,
+        'username': username,
+    })
@@ -0,0 +1,46 @@
+import io
+import os
+
+from django.conf import settings
+from django.core.files.uploadedfile import SimpleUploadedFile
+from PIL import Image, ImageOps
+
+# Параметры сохранения по формату загрузки. MPO — так Pillow называет
+# JPEG с телефонов, в которых спрятано несколько кадров.
+SAVE_OPTIONS = {
+    'JPEG': ('JPEG', {'quality': 85, 'optimize': True, 'progressive': True}),
+    'MPO': ('JPEG', {'quality': 85, 'optimize': True, 'progressive': True}),
+    'PNG': ('PNG', {'optimize': True}),
+    'GIF': ('GIF', {}),
+    'WEBP': ('WEBP', {'quality': 85}),
+}
+# Остальные форматы (BMP, TIFF и т. п.) сохраняем в PNG.
+FALLBACK = ('PNG', {'optimize': True})
+
+
+def normalize(upload):
+    """
+    Готовит загруженную картинку к хранению: поворачивает по EXIF,
+    уменьшает до POST_IMAGE_MAX_SIZE по большей стороне и сохраняет
+    заново, так что EXIF, GPS и прочие метаданные отбрасываются.
+    Анимированные картинки сохраняются как есть.
+    """
+    upload.seek(0)
+    image = Image.open(upload)
+    if getattr(image, 'is_animated', False):
+        upload.seek(0)
+        return upload
+    source_format = image.format
+    image_format, options = SAVE_OPTIONS.get(source_format, FALLBACK)
+    image = ImageOps.exif_transpose(image)
+    limit = settings.POST_IMAGE_MAX_SIZE
+    image.thumbnail((limit, limit), Image.LANCZOS)
+    if image_format == 'JPEG' and image.mode not in ('RGB', 'L'):
+        image = image.convert('RGB')
+    buffer = io.BytesIO()
+    image.save(buffer, image_format, **options)
+    name = upload.name
+    if source_format not in SAVE_OPTIONS:
+        name = os.path.splitext(name)[0] + '.png'
+    return SimpleUploadedFile(name, buffer.getvalue(),
+                              Image.MIME[image_format])
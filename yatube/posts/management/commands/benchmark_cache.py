@@ -0,0 +1,103 @@
+import multiprocessing
+import os
+import random
+import shutil
+import tempfile
+import time
+
+from django.core.cache.backends.filebased import FileBasedCache
+from django.core.cache.backends.locmem import LocMemCache
+from django.core.management.base import BaseCommand
+
+from yatube.cache_backends import SQLiteCache
+
+
+def make_backends(directory):
+    return {
+        'locmem': lambda: LocMemCache('benchmark', {
+            'OPTIONS': {'MAX_ENTRIES': 100000}}),
+        'filebased': lambda: FileBasedCache(
+            os.path.join(directory, 'files'), {
+                'OPTIONS': {'MAX_ENTRIES': 100000}}),
+        'sqlite': lambda: SQLiteCache(
+            os.path.join(directory, 'cache.sqlite3'), {
+                'OPTIONS': {'MAX_ENTRIES': 100000}}),
+    }
+
+
+def _worker(factory, keys, operations, seed, results):
+    # Каждый процесс создаёт свой экземпляр бэкенда, как воркер gunicorn.
+    cache = factory()
+    rng = random.Random(seed)
+    hits = 0
+    started = time.perf_counter()
+    for _ in range(operations):
+        key = f'page:{rng.randrange(keys)}'
+        if cache.get(key) is None:
+            cache.set(key, 'x' * 2048)
+        else:
+            hits += 1
+    results.put((hits, time.perf_counter() - started))
+
+
+class Command(BaseCommand):
+    help = ('Сравнивает LocMemCache, FileBasedCache и SQLiteCache: '
+            'скорость операций и долю попаданий при нескольких воркерах.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--operations', type=int, default=5000)
+        parser.add_argument('--workers', type=int, default=4)
+        parser.add_argument('--keys', type=int, default=500)
+
+    def handle(self, *args, **options):
+        directory = tempfile.mkdtemp()
+        try:
+            for name, factory in make_backends(directory).items():
+                self.single_process(name, factory(), options['operations'])
+                self.multi_process(name, factory, options)
+        finally:
+            shutil.rmtree(directory, ignore_errors=True)
+
+    def single_process(self, name, cache, operations):
+        cache.clear()
+        value = 'x' * 2048
+        timings = {}
+        started = time.perf_counter()
+        for number in range(operations):
+            cache.set(f'key:{number}', value)
+        timings['set'] = time.perf_counter() - started
+        started = time.perf_counter()
+        for number in range(operations):
+            cache.get(f'key:{number}')
+        timings['get'] = time.perf_counter() - started
+        cache.set('counter', 0)
+        started = time.perf_counter()
+        for _ in range(operations):
+            cache.incr('counter')
+        timings['incr'] = time.perf_counter() - started
+        report = ', '.join(
+            f'{operation} {operations / elapsed:,.0f} оп/с'
+            for operation, elapsed in timings.items())
+        self.stdout.write(f'{name}: {report}')
+
+    def multi_process(self, name, factory, options):
+        factory().clear()
+        context = multiprocessing.get_context('fork')
+        results = context.Queue()
+        workers = [
+            context.Process(target=_worker, args=(
+                factory, options['keys'], options['operations'],
+                seed, results))
+            for seed in range(options['workers'])
+        ]
+        for worker in workers:
+            worker.start()
+        outcomes = [results.get() for _ in workers]
+        for worker in workers:
+            worker.join()
+        hits = sum(hit for hit, _ in outcomes)
+        total = options['operations'] * options['workers']
+        slowest = max(elapsed for _, elapsed in outcomes)
+        self.stdout.write(
+            f'{name}, {options["workers"]} воркера: '
+            f'попаданий {hits / total:.1%}, {total / slowest:,.0f} оп/с')
@@ -0,0 +1,132 @@
+import random
+import threading
+import time
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, connections
+from django.test import Client
+from django.urls import reverse
+
+from posts.models import Post
+
+from .benchmark_views import percentile
+
+User = get_user_model()
+
+# Прежний профиль базы: стандартный backend, журнал отката и новое
+# соединение на каждый запрос.
+PLAIN = {
+    'ENGINE': 'django.db.backends.sqlite3',
+    'CONN_MAX_AGE': 0,
+    'OPTIONS': {},
+}
+
+
+class Command(BaseCommand):
+    help = ('Нагружает сайт из нескольких потоков смесью чтения '
+            'и комментариев и сравнивает пропускную способность '
+            'и ошибки «database is locked» прежнего профиля SQLite '
+            'и профиля с WAL.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--threads', type=int, default=8)
+        parser.add_argument('--seconds', type=float, default=10)
+        parser.add_argument('--write-ratio', type=float, default=0.2,
+                            help='Доля запросов, добавляющих комментарий.')
+        parser.add_argument('--profile', choices=['plain', 'tuned', 'both'],
+                            default='both')
+        parser.add_argument('--seed', type=int, default=0)
+
+    def handle(self, *args, **options):
+        if connection.vendor != 'sqlite':
+            raise CommandError('Бенчмарк рассчитан на SQLite.')
+        self.targets = self.prepare()
+        tuned = dict(connections.databases['default'])
+        profiles = {'plain': {**tuned, **PLAIN}, 'tuned': tuned}
+        if options['profile'] != 'both':
+            profiles = {options['profile']: profiles[options['profile']]}
+        try:
+            for name, profile in profiles.items():
+                self.switch(profile)
+                self.report(name, self.run(options))
+        finally:
+            self.switch(tuned)
+
+    def prepare(self):
+        posts = list(Post.objects.select_related('author')
+                     .order_by('-pk')[:100])
+        users = list(User.objects.order_by('pk')[:50])
+        if not posts or not users:
+            raise CommandError('База пуста: сначала выполните seed_data.')
+        return posts, users
+
+    def switch(self, profile):
+        """
+        Переключает профиль базы для всех потоков. Режим журнала хранится
+        в файле базы, поэтому прежний профиль возвращает журнал отката.
+        """
+        connections.close_all()
+        connections.databases['default'] = profile
+        # Обёртка соединения хранится в потоке: без неё следующее
+        # обращение создаст новую с новыми настройками.
+        if hasattr(connections._connections, 'default'):
+            delattr(connections._connections, 'default')
+        journal = 'WAL' if profile['ENGINE'] != PLAIN['ENGINE'] else 'DELETE'
+        with connections['default'].cursor() as cursor:
+            cursor.execute(f'PRAGMA journal_mode = {journal}')
+        connections.close_all()
+
+    def run(self, options):
+        deadline = time.monotonic() + options['seconds']
+        results = []
+        threads = [
+            threading.Thread(target=self.worker, args=(
+                number, deadline, options, results))
+            for number in range(options['threads'])
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        return results, options['seconds']
+
+    def worker(self, number, deadline, options, results):
+        rng = random.Random(options['seed'] + number)
+        posts, users = self.targets
+        client = Client()
+        client.force_login(users[number % len(users)])
+        own = []
+        try:
+            while time.monotonic() < deadline:
+                post = rng.choice(posts)
+                kwargs = {'username': post.author.username,
+                          'post_id': post.pk}
+                write = rng.random() < options['write_ratio']
+                started = time.perf_counter()
+                try:
+                    if write:
+                        response = client.post(
+                            reverse('add_comment', kwargs=kwargs),
+                            {'text': 'Нагрузочный комментарий'})
+                    else:
+                        response = client.get(reverse('post', kwargs=kwargs))
+                    ok = response.status_code < 400
+                except Exception:
+                    ok = False
+                own.append((write, ok, time.perf_counter() - started))
+        finally:
+            connections.close_all()
+            results.extend(own)
+
+    def report(self, name, run):
+        results, seconds = run
+        done = [timing for _, ok, timing in results if ok]
+        errors = sum(1 for _, ok, _ in results if not ok)
+        writes = sum(1 for write, ok, _ in results if write and ok)
+        line = (f'{name}: {len(done) / seconds:.1f} запросов/с '
+                f'(записей {writes / seconds:.1f}/с), ошибок {errors}')
+        if done:
+            line += (f', p50 {percentile(done, 0.5) * 1000:.1f} ms, '
+                     f'p95 {percentile(done, 0.95) * 1000:.1f} ms')
+        self.stdout.write(line)
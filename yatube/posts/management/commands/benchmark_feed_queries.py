@@ -0,0 +1,40 @@
+import time
+
+from django.core.management.base import BaseCommand
+from django.db.models import Count
+
+from posts.models import Post, Group
+from posts.queryplans import explain, feed_queries
+
+
+class Command(BaseCommand):
+    help = ('Показывает план и время запросов лент: сортировка должна '
+            'идти по индексу, без USE TEMP B-TREE FOR ORDER BY.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--repeat', type=int, default=100)
+
+    def handle(self, *args, **options):
+        # Берём самых «тяжёлых» автора, группу и пост текущей базы.
+        author = (Post.objects.values('author').annotate(n=Count('pk'))
+                  .order_by('-n').values_list('author', flat=True).first())
+        group = (Group.objects.annotate(n=Count('posts')).order_by('-n')
+                 .values_list('pk', flat=True).first())
+        post = (Post.objects.annotate(n=Count('comments')).order_by('-n')
+                .values_list('pk', flat=True).first())
+        if author is None:
+            self.stderr.write('В базе нет постов, измерять нечего.')
+            return
+        queries = feed_queries(author, group, post)
+        for name, queryset in queries.items():
+            plan = explain(queryset)
+            started = time.perf_counter()
+            for _ in range(options['repeat']):
+                list(queryset.all())
+            elapsed = (time.perf_counter() - started) / options['repeat']
+            sorted_by_index = not any('TEMP B-TREE' in row for row in plan)
+            self.stdout.write(
+                f'{name}: {elapsed * 1000:.3f} ms, '
+                f'сортировка по индексу: {"да" if sorted_by_index else "нет"}')
+            for row in plan:
+                self.stdout.write(f'    {row}')
@@ -0,0 +1,57 @@
+import re
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.test import Client
+from django.urls import reverse
+
+ASSET = re.compile(r'(?:href|src)="({}[^"]+)"'.format(
+    re.escape(settings.STATIC_URL)))
+
+
+def body_size(response):
+    if response.streaming:
+        size = sum(len(chunk) for chunk in response.streaming_content)
+        response.close()
+        return size
+    return len(response.content)
+
+
+class Command(BaseCommand):
+    help = ('Считает байты, которые браузер скачивает при первой '
+            'загрузке страницы, и статику, которую он будет '
+            'перепроверять при повторных визитах.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('urls', nargs='*',
+                            help='Страницы; по умолчанию главная.')
+
+    def handle(self, *args, **options):
+        client = Client()
+        for url in options['urls'] or [reverse('index')]:
+            self.measure(client, url)
+
+    def measure(self, client, url):
+        page = client.get(url)
+        html = page.content.decode()
+        total = {'gzip': len(page.content), 'identity': len(page.content)}
+        assets = sorted(set(ASSET.findall(html)))
+        revalidated, missing = [], []
+        for asset in assets:
+            for encoding in total:
+                response = client.get(asset, HTTP_ACCEPT_ENCODING=encoding)
+                if response.status_code != 200:
+                    missing.append(asset)
+                    break
+                total[encoding] += body_size(response)
+            else:
+                if 'immutable' not in response.get('Cache-Control', ''):
+                    revalidated.append(asset)
+        self.stdout.write(
+            f'{url}: статики {len(assets)}, холодная загрузка '
+            f'{total["gzip"]} байт со сжатием, {total["identity"]} без; '
+            f'перепроверяется при повторном визите: {len(revalidated)}')
+        for asset in revalidated:
+            self.stdout.write(f'  без immutable: {asset}')
+        for asset in missing:
+            self.stderr.write(f'  не найдено: {asset}')
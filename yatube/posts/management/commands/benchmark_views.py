@@ -0,0 +1,163 @@
+import datetime as dt
+import json
+import os
+import subprocess
+import time
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.db.models import Count
+from django.test import Client
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from posts.models import Comment, Follow, Group, Post
+
+
+User = get_user_model()
+
+
+def percentile(values, fraction):
+    # Ближайший ранг: без интерполяции, значение всегда из выборки.
+    ordered = sorted(values)
+    index = max(0, min(len(ordered) - 1,
+                       round(fraction * len(ordered) + 0.5) - 1))
+    return ordered[index]
+
+
+def git_commit():
+    try:
+        return subprocess.run(
+            ['git', 'rev-parse', '--short', 'HEAD'], cwd=settings.BASE_DIR,
+            capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+class Command(BaseCommand):
+    help = ('Замеряет p50/p95/p99 времени ответа и число запросов '
+            'для всех страниц posts.urls и сохраняет результат в JSON.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--requests', type=int, default=50,
+                            help='Запросов к каждой странице.')
+        parser.add_argument('--warmup', type=int, default=3)
+        parser.add_argument('--cold', action='store_true',
+                            help='Очищать кэш перед каждым запросом.')
+        parser.add_argument('--output',
+                            help='Файл результатов; по умолчанию '
+                                 'benchmarks/<дата>-<коммит>.json.')
+        parser.add_argument('--compare',
+                            help='Файл прошлого запуска для сравнения.')
+
+    def handle(self, *args, **options):
+        targets = self.targets()
+        results = {}
+        for name, (client, url) in targets.items():
+            results[name] = self.measure(client, url, options)
+            self.report(name, results[name], options['compare'])
+        run = {
+            'commit': git_commit(),
+            'created': dt.datetime.now(dt.timezone.utc).isoformat(),
+            'requests': options['requests'],
+            'cold': options['cold'],
+            'dataset': {model.__name__: model.objects.count()
+                        for model in (User, Group, Post, Comment, Follow)},
+            'results': results,
+        }
+        path = options['output'] or os.path.join(
+            settings.BASE_DIR, 'benchmarks',
+            f'{dt.date.today():%Y%m%d}-{run["commit"] or "nogit"}.json')
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        with open(path, 'w', encoding='utf-8') as output:
+            json.dump(run, output, ensure_ascii=False, indent=2)
+        self.stdout.write(self.style.SUCCESS(f'Результаты записаны в {path}'))
+
+    def targets(self):
+        """Страницы posts.urls на самых нагруженных данных базы."""
+        post = (Post.objects.annotate(n=Count('comments')).order_by('-n')
+                .select_related('author').first())
+        group = Group.objects.annotate(n=Count('posts')).order_by('-n').first()
+        reader = (User.objects.annotate(n=Count('follower')).order_by('-n')
+                  .first())
+        if post is None or group is None or reader is None:
+            raise CommandError('База пуста: сначала выполните seed_data.')
+        author = post.author
+        guest = Client()
+        member = Client()
+        member.force_login(reader)
+        owner = Client()
+        owner.force_login(author)
+        word = post.text.split()[0]
+        post_kwargs = {'username': author.username, 'post_id': post.id}
+        # Страницы 404/ и 500/ не измеряются: это заготовки обработчиков
+        # ошибок, а не страницы сайта.
+        return {
+            'index': (guest, reverse('index')),
+            'group_posts': (guest, reverse('group_posts',
+                                           kwargs={'slug': group.slug})),
+            'search': (guest, f'{reverse("search")}?q={word}'),
+            'profile': (guest, reverse('profile', args=[author.username])),
+            'post': (guest, reverse('post', kwargs=post_kwargs)),
+            'post_comments': (guest, reverse('post_comments',
+                                             kwargs=post_kwargs)),
+            'follow_index': (member, reverse('follow_index')),
+            'new_post': (member, reverse('new_post')),
+            'post_edit': (owner, reverse('post_edit', kwargs=post_kwargs)),
+            'add_comment': (member, reverse('add_comment',
+                                            kwargs=post_kwargs)),
+            # Подписка и отписка по очереди: состояние базы не копится.
+            'profile_follow+unfollow': (member, (
+                reverse('profile_follow', args=[author.username]),
+                reverse('profile_unfollow', args=[author.username]))),
+        }
+
+    def measure(self, client, urls, options):
+        if isinstance(urls, str):
+            urls = (urls,)
+        for _ in range(options['warmup']):
+            for url in urls:
+                client.get(url)
+        timings, queries = [], []
+        for _ in range(options['requests']):
+            for url in urls:
+                if options['cold']:
+                    cache.clear()
+                with CaptureQueriesContext(connection) as context:
+                    started = time.perf_counter()
+                    response = client.get(url)
+                    timings.append(time.perf_counter() - started)
+                if response.status_code >= 400:
+                    raise CommandError(
+                        f'{url} ответил {response.status_code}')
+                queries.append(len(context))
+        return {
+            'urls': list(urls),
+            'p50_ms': percentile(timings, 0.50) * 1000,
+            'p95_ms': percentile(timings, 0.95) * 1000,
+            'p99_ms': percentile(timings, 0.99) * 1000,
+            'mean_ms': sum(timings) / len(timings) * 1000,
+            'queries': max(queries),
+        }
+
+    def report(self, name, result, compare):
+        line = (f'{name}: p50 {result["p50_ms"]:.2f} ms, '
+                f'p95 {result["p95_ms"]:.2f} ms, '
+                f'p99 {result["p99_ms"]:.2f} ms, '
+                f'запросов {result["queries"]}')
+        if compare:
+            previous = self.previous(compare).get(name)
+            if previous:
+                change = result['p50_ms'] / previous['p50_ms'] - 1
+                line += (f' (p50 {change:+.0%}, запросов было '
+                         f'{previous["queries"]})')
+        self.stdout.write(line)
+
+    def previous(self, path):
+        if not hasattr(self, '_previous'):
+            with open(path, encoding='utf-8') as run:
+                self._previous = json.load(run)['results']
+        return self._previous
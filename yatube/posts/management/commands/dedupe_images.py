@@ -0,0 +1,63 @@
+from django.core.exceptions import SuspiciousFileOperation
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from posts.cache import bump_feed_version, bump_post_version
+from posts.models import Post
+from posts.storage import content_hash, hashed_name
+
+
+class Command(BaseCommand):
+    help = ('Переводит картинки постов на имена по хэшу содержимого: '
+            'одинаковые файлы схлопываются в один, Post.image '
+            'указывает на него, а старые копии удаляются.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--dry-run', action='store_true',
+                            help='Только показать, что будет сделано.')
+        parser.add_argument('--keep-originals', action='store_true',
+                            help='Не удалять старые файлы.')
+
+    def handle(self, *args, **options):
+        storage = Post._meta.get_field('image').storage
+        names = list(Post.objects.exclude(image__isnull=True)
+                     .exclude(image='').order_by('image')
+                     .values_list('image', flat=True).distinct())
+        targets, moved, missing = set(), 0, 0
+        for name in names:
+            if not self.exists(storage, name):
+                self.stderr.write(f'Файл не найден: {name}')
+                missing += 1
+                continue
+            with storage.open(name) as source:
+                target = hashed_name(name, content_hash(source))
+                if target != name and not options['dry_run']:
+                    storage.save(name, source)
+            targets.add(target)
+            if target == name:
+                continue
+            moved += 1
+            self.stdout.write(f'{name} -> {target}')
+            if options['dry_run']:
+                continue
+            with transaction.atomic():
+                posts = Post.objects.filter(image=name)
+                pks = list(posts.values_list('pk', flat=True))
+                posts.update(image=target)
+            # update() идёт в обход сигналов: карточки сбрасываем сами.
+            for pk in pks:
+                bump_post_version(pk)
+            if not options['keep_originals']:
+                storage.delete(name)
+        if moved and not options['dry_run']:
+            bump_feed_version()
+        self.stdout.write(self.style.SUCCESS(
+            f'Перенесено файлов: {moved}, уникальных картинок: '
+            f'{len(targets)}, не найдено: {missing}'))
+
+    def exists(self, storage, name):
+        # Имена вне MEDIA_ROOT (абсолютные пути) хранилище не открывает.
+        try:
+            return storage.exists(name)
+        except SuspiciousFileOperation:
+            return False
@@ -0,0 +1,16 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from posts import timeline
+from posts.models import TimelineEntry
+
+
+class Command(BaseCommand):
+    help = 'Перестраивает ленты подписок (TimelineEntry) по таблице Follow.'
+
+    def handle(self, *args, **options):
+        with transaction.atomic():
+            timeline.rebuild()
+        entries = TimelineEntry.objects.count()
+        self.stdout.write(self.style.SUCCESS(
+            f'Ленты подписок перестроены, записей: {entries}'))
@@ -0,0 +1,12 @@
+from django.core.management.base import BaseCommand
+
+from posts.stats import reconcile
+
+
+class Command(BaseCommand):
+    help = 'Сверяет счётчики UserStats с базой и исправляет расхождения.'
+
+    def handle(self, *args, **options):
+        fixed = reconcile()
+        self.stdout.write(self.style.SUCCESS(
+            f'Исправлено счётчиков пользователей: {fixed}'))
@@ -0,0 +1,37 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from posts.seeding import Seeder
+
+
+class Command(BaseCommand):
+    help = ('Заполняет базу синтетическими пользователями, группами, '
+            'постами с картинками, комментариями и подписками.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--users', type=int, default=1000)
+        parser.add_argument('--groups', type=int, default=20)
+        parser.add_argument('--posts', type=int, default=20000)
+        parser.add_argument('--comments', type=int, default=50000)
+        parser.add_argument('--follows', type=int, default=20000)
+        parser.add_argument('--image-ratio', type=float, default=0.2,
+                            help='Доля постов с картинкой.')
+        parser.add_argument('--days', type=int, default=365,
+                            help='За сколько дней распределить посты.')
+        parser.add_argument('--seed', type=int, default=0)
+        parser.add_argument('--batch-size', type=int, default=1000)
+
+    def handle(self, *args, **options):
+        if options['users'] < 2 and (options['posts'] or options['follows']):
+            raise CommandError('Для постов и подписок нужно хотя бы '
+                               'два пользователя.')
+        started = time.perf_counter()
+        seeder = Seeder(seed=options['seed'],
+                        batch_size=options['batch_size'],
+                        days=options['days'], stdout=self.stdout)
+        seeder.run(options['users'], options['groups'], options['posts'],
+                   options['comments'], options['follows'],
+                   options['image_ratio'])
+        self.stdout.write(self.style.SUCCESS(
+            f'Данные созданы за {time.perf_counter() - started:.1f} с'))
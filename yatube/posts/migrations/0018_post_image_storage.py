@@ -0,0 +1,23 @@
+# Generated by Django 2.2.6 on 2026-10-18 17:56
+
+from django.db import migrations, models
+import posts.storage
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('posts', '0017_post_search'),
+    ]
+
+    # Хранилище в базе не отражается, а AlterField на SQLite пересоздал
+    # бы таблицу posts_post и вместе с ней удалил триггеры поиска.
+    operations = [
+        migrations.SeparateDatabaseAndState(state_operations=[
+            migrations.AlterField(
+                model_name='post',
+                name='image',
+                field=models.ImageField(blank=True, null=True, storage=posts.storage.ContentAddressedStorage(), upload_to='posts/'),
+            ),
+        ]),
+    ]
@@ -1,27 +1,58 @@
 from django.db import models
+from django.db.models import Count, IntegerField, OuterRef, Subquery
+from django.db.models.functions import Coalesce
 from django.contrib.auth import get_user_model
+from .storage import post_image_storage
 from .validators import validate_not_empty
 
 
 User = get_user_model()
 
 
+class PostQuerySet(models.QuerySet):
+    def with_related(self):
+        """
+        Подтягивает автора и группу одним запросом и добавляет
+        к каждому посту количество комментариев (comment_count).
+        """
+        comments = (Comment.objects.filter(post=OuterRef('pk'))
+                    .order_by()
+                    .values('post')
+                    .annotate(count=Count('pk'))
+                    .values('count'))
+        return self.select_related('author', 'group').annotate(
+            comment_count=Coalesce(
+                Subquery(comments, output_field=IntegerField()), 0))
+
+
 class Post(models.Model):
     text = models.TextField(validators=[validate_not_empty])
     pub_date = models.DateTimeField('Дата публикации',
                                     auto_now_add=True,
                                     db_index=True)
+    # Индексы по author и group покрываются составными индексами из Meta.
     author = models.ForeignKey(User, on_delete=models.CASCADE,
-                               related_name="posts")
+                               related_name="posts", db_index=False)
     group = models.ForeignKey('Group', on_delete=models.SET_NULL,
-                              blank=True, null=True, related_name="posts")
-    image = models.ImageField(upload_to='posts/', blank=True, null=True)
+                              blank=True, null=True, related_name="posts",
+                              db_index=False)
+    # Имя файла — хэш содержимого: одинаковые картинки хранятся один раз.
+    image = models.ImageField(upload_to='posts/', storage=post_image_storage,
+                              blank=True, null=True)
+
+    objects = PostQuerySet.as_manager()
 
     def __str__(self):
         return self.text[:15]
 
     class Meta:
         ordering = ["-pub_date"]
+        indexes = [
+            models.Index(fields=['author', 'pub_date'],
+                         name='post_author_pub_date'),
+            models.Index(fields=['group', 'pub_date'],
+                         name='post_group_pub_date'),
+        ]
 
 
 class Group(models.Model):
@@ -36,7 +67,8 @@ class Group(models.Model):
 class Comment(models.Model):
     post = models.ForeignKey(Post,
                              on_delete=models.CASCADE,
-                             related_name='comments')
+                             related_name='comments',
+                             db_index=False)
     author = models.ForeignKey(User,
                                on_delete=models.CASCADE,
                                related_name='comments')
@@ -50,12 +82,71 @@ class Comment(models.Model):
 
     class Meta:
         ordering = ["-created"]
+        indexes = [
+            models.Index(fields=['post', 'created'],
+                         name='comment_post_created'),
+        ]
 
 
 class Follow(models.Model):
+    # Отдельные индексы по FK не нужны: их покрывают составные индексы
+    # (user, author) и (author, user) из Meta.
+    user = models.ForeignKey(User,
+                             on_delete=models.CASCADE,
+                             related_name='follower',
+                             db_index=False)
+    author = models.ForeignKey(User,
+                               on_delete=models.CASCADE,
+                               related_name='following',
+                               db_index=False)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['user', 'author'],
+                                    name='unique_follow'),
+        ]
+        indexes = [
+            models.Index(fields=['author', 'user'],
+                         name='follow_author_user'),
+        ]
+
+
+class TimelineEntry(models.Model):
+    """
+    Материализованная лента подписок: строка на каждый пост автора,
+    на которого подписан user. Заполняется при публикации поста.
+    """
     user = models.ForeignKey(User,
                              on_delete=models.CASCADE,
-                             related_name='follower')
+                             related_name='timeline')
+    post = models.ForeignKey(Post,
+                             on_delete=models.CASCADE,
+                             related_name='timeline_entries')
     author = models.ForeignKey(User,
                                on_delete=models.CASCADE,
-                               related_name='following')
+                               related_name='+')
+    pub_date = models.DateTimeField()
+
+    class Meta:
+        ordering = ["-pub_date"]
+        constraints = [
+            models.UniqueConstraint(fields=['user', 'post'],
+                                    name='unique_timeline_post'),
+        ]
+        indexes = [
+            models.Index(fields=['user', 'pub_date'],
+                         name='timeline_user_pub_date'),
+            models.Index(fields=['user', 'author'],
+                         name='timeline_user_author'),
+        ]
+
+
+class UserStats(models.Model):
+    """Денормализованные счётчики для карточки автора."""
+    user = models.OneToOneField(User,
+                                on_delete=models.CASCADE,
+                                primary_key=True,
+                                related_name='stats')
+    followers_count = models.PositiveIntegerField(default=0)
+    following_count = models.PositiveIntegerField(default=0)
+    posts_count = models.PositiveIntegerField(default=0)
@@ -0,0 +1,80 @@
+import functools
+import gzip
+import hashlib
+
+from django.conf import settings
+from django.core.cache import cache
+from django.http import HttpResponse
+from django.utils.cache import patch_vary_headers
+
+from . import fragments
+from .cache import FEED_VERSION_KEY, FOLLOW_VERSION_KEY, record, versions
+
+
+def page_key(request, audience):
+    """
+    Ключ страницы: версии лент и подписок меняются при любой записи,
+    которая видна на странице. То, что версиями не покрыто (например,
+    имя автора), устаревает не дольше чем на PAGE_CACHE_TIMEOUT.
+    """
+    path = hashlib.md5(request.get_full_path().encode()).hexdigest()
+    current = versions([FEED_VERSION_KEY, FOLLOW_VERSION_KEY]).values()
+    return 'posts:page:{}:{}:{}'.format(
+        audience, ':'.join(str(version) for version in current), path)
+
+
+def cacheable(request, response):
+    return (response.status_code == 200 and not response.streaming
+            and not response.cookies
+            and not request.META.get('CSRF_COOKIE_USED'))
+
+
+def anonymous_response(request, entry):
+    response = HttpResponse(content_type=entry['content_type'])
+    if 'gzip' in request.META.get('HTTP_ACCEPT_ENCODING', ''):
+        response.content = entry['body']
+        response['Content-Encoding'] = 'gzip'
+    else:
+        response.content = gzip.decompress(entry['body'])
+    patch_vary_headers(response, ['Accept-Encoding'])
+    return response
+
+
+def cached_page(view):
+    """
+    Кэширует страницу целиком. Анонимам отдаётся готовая страница,
+    сжатая gzip заранее. Для остальных кэшируется каркас страницы,
+    в котором фрагменты пользователя (меню, кнопки подписки
+    и редактирования) заменены метками, и при каждом запросе
+    рисуются только они.
+    """
+    @functools.wraps(view)
+    def wrapper(request, *args, **kwargs):
+        if not settings.PAGE_CACHE or request.method not in ('GET', 'HEAD'):
+            return view(request, *args, **kwargs)
+        anonymous = not request.user.is_authenticated
+        key = page_key(request, 'anonymous' if anonymous else 'skeleton')
+        entry = cache.get(key)
+        record('page', entry is not None)
+        if entry is None:
+            request.page_skeleton = not anonymous
+            try:
+                response = view(request, *args, **kwargs)
+            finally:
+                request.page_skeleton = False
+            if not cacheable(request, response):
+                if not anonymous and not response.streaming:
+                    response.content = fragments.fill(
+                        request, response.content.decode(response.charset))
+                return response
+            entry = {'content_type': response['Content-Type']}
+            if anonymous:
+                entry['body'] = gzip.compress(response.content)
+            else:
+                entry['body'] = response.content.decode(response.charset)
+            cache.set(key, entry, settings.PAGE_CACHE_TIMEOUT)
+        if anonymous:
+            return anonymous_response(request, entry)
+        return HttpResponse(fragments.fill(request, entry['body']),
+                            content_type=entry['content_type'])
+    return wrapper
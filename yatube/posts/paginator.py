@@ -0,0 +1,124 @@
+import base64
+import binascii
+import json
+from datetime import datetime
+
+from django.core.paginator import Page, Paginator
+from django.db.models import Q
+from django.utils.dateparse import parse_datetime
+
+POSTS_PER_PAGE = 10
+COMMENTS_PER_PAGE = 20
+
+NEXT = 'n'
+PREVIOUS = 'p'
+
+
+def encode_cursor(direction, value, pk):
+    # DjangoJSONEncoder обрезает время до миллисекунд, а ключу нужна
+    # полная точность, иначе соседние записи будут пропущены.
+    raw = json.dumps([direction, value, pk],
+                     default=lambda value: value.isoformat())
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip('=')
+
+
+def decode_cursor(cursor, kind=datetime):
+    """
+    Возвращает (direction, value, pk) или None для битого курсора.
+    Значение ключа должно иметь тип kind: курсор приходит от клиента,
+    и чужой тип в фильтре queryset обернулся бы ошибкой 500.
+    """
+    if not cursor:
+        return None
+    try:
+        raw = base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4))
+        direction, value, pk = json.loads(raw.decode())
+        if kind is datetime and isinstance(value, str):
+            value = parse_datetime(value)
+    except (binascii.Error, UnicodeDecodeError, ValueError, TypeError):
+        return None
+    if direction not in (NEXT, PREVIOUS) or type(pk) is not int:
+        return None
+    if not isinstance(value, kind) or isinstance(value, bool):
+        return None
+    return direction, value, pk
+
+
+class CursorPaginator(Paginator):
+    """
+    Паджинатор по ключу (field, pk) от новых записей к старым.
+
+    В отличие от Paginator не считает COUNT(*) и не использует OFFSET:
+    каждая страница выбирается условием по ключу последней записи,
+    поэтому время выборки не зависит от глубины страницы.
+    """
+
+    def __init__(self, object_list, per_page, field='pub_date'):
+        super().__init__(object_list, per_page)
+        self.field = field
+
+    def __getstate__(self):
+        # Готовую страницу кладут в кэш вместе с паджинатором; исходный
+        # queryset при сериализации выполнился бы целиком, он не нужен.
+        state = self.__dict__.copy()
+        state['object_list'] = None
+        return state
+
+    def key(self, obj):
+        # Строки .values() приходят словарями, объекты моделей — нет.
+        if isinstance(obj, dict):
+            return obj[self.field], obj['id']
+        return getattr(obj, self.field), obj.pk
+
+    def get_page(self, cursor=None):
+        position = decode_cursor(cursor)
+        if position is None:
+            return self._forward(self.object_list, has_previous=False)
+        direction, value, pk = position
+        if direction == NEXT:
+            older = (Q(**{f'{self.field}__lt': value})
+                     | Q(**{self.field: value, 'pk__lt': pk}))
+            return self._forward(self.object_list.filter(older),
+                                 has_previous=True)
+        newer = (Q(**{f'{self.field}__gt': value})
+                 | Q(**{self.field: value, 'pk__gt': pk}))
+        return self._backward(self.object_list.filter(newer))
+
+    def _forward(self, queryset, has_previous):
+        rows = list(queryset.order_by(f'-{self.field}', '-pk')
+                    [:self.per_page + 1])
+        has_next = len(rows) > self.per_page
+        return self._page(rows[:self.per_page], has_next, has_previous)
+
+    def _backward(self, queryset):
+        rows = list(queryset.order_by(self.field, 'pk')
+                    [:self.per_page + 1])
+        has_previous = len(rows) > self.per_page
+        rows = rows[:self.per_page][::-1]
+        return self._page(rows, bool(rows), has_previous)
+
+    def _page(self, rows, has_next, has_previous):
+        next_cursor = previous_cursor = None
+        if rows and has_next:
+            next_cursor = encode_cursor(NEXT, *self.key(rows[-1]))
+        if rows and has_previous:
+            previous_cursor = encode_cursor(PREVIOUS, *self.key(rows[0]))
+        return cursor_page(rows, self, next_cursor, previous_cursor)
+
+
+def cursor_page(rows, paginator, next_cursor=None, previous_cursor=None):
+    # Страница остаётся обычным Page: номер и число страниц описывают
+    # окно «предыдущая / текущая / следующая», так что has_next()
+    # и has_previous() работают без подсчёта записей.
+    number = 2 if previous_cursor else 1
+    paginator.num_pages = number + 1 if next_cursor else number
+    page = Page(rows, number, paginator)
+    page.next_cursor = next_cursor
+    page.previous_cursor = previous_cursor
+    return page
+
+
+def paginate(request, object_list, per_page=POSTS_PER_PAGE,
+             field='pub_date'):
+    paginator = CursorPaginator(object_list, per_page, field)
+    return paginator.get_page(request.GET.get('cursor'))
@@ -0,0 +1,26 @@
+from django.db import connection
+
+from .models import Post, Comment
+from .paginator import POSTS_PER_PAGE
+
+
+def feed_queries(author_id, group_id, post_id):
+    """Запросы первых страниц лент в том виде, как их строят view."""
+    limit = POSTS_PER_PAGE + 1
+    return {
+        'index': Post.objects.with_related()
+        .order_by('-pub_date', '-pk')[:limit],
+        'profile': Post.objects.with_related().filter(author_id=author_id)
+        .order_by('-pub_date', '-pk')[:limit],
+        'group_posts': Post.objects.with_related().filter(group_id=group_id)
+        .order_by('-pub_date', '-pk')[:limit],
+        'comments': Comment.objects.filter(post_id=post_id)
+        .order_by('-created', '-pk')[:limit],
+    }
+
+
+def explain(queryset):
+    sql, params = queryset.query.sql_with_params()
+    with connection.cursor() as cursor:
+        cursor.execute('EXPLAIN QUERY PLAN ' + sql, params)
+        return [row[-1] for row in cursor.fetchall()]
@@ -0,0 +1,121 @@
+import re
+
+from django.core.paginator import Paginator
+from django.db import DEFAULT_DB_ALIAS, connection, connections
+from django.db.models.expressions import RawSQL
+
+from .models import Post
+from .paginator import (NEXT, POSTS_PER_PAGE, PREVIOUS, cursor_page,
+                        decode_cursor, encode_cursor)
+
+FTS_TABLE = 'posts_post_fts'
+MAX_TERMS = 10
+
+# Индекс хранит только ссылки на строки posts_post (external content),
+# а триггеры держат его в согласии с таблицей при любых изменениях,
+# в том числе сделанных в обход ORM.
+SCHEMA = [
+    f"CREATE VIRTUAL TABLE IF NOT EXISTS {FTS_TABLE} USING fts5("
+    f"text, content='posts_post', content_rowid='id', "
+    f"tokenize='unicode61 remove_diacritics 2')",
+    f"CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_insert "
+    f"AFTER INSERT ON posts_post BEGIN "
+    f"INSERT INTO {FTS_TABLE} (rowid, text) VALUES (new.id, new.text); "
+    f"END",
+    f"CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_delete "
+    f"AFTER DELETE ON posts_post BEGIN "
+    f"INSERT INTO {FTS_TABLE} ({FTS_TABLE}, rowid, text) "
+    f"VALUES ('delete', old.id, old.text); "
+    f"END",
+    f"CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_update "
+    f"AFTER UPDATE OF text ON posts_post BEGIN "
+    f"INSERT INTO {FTS_TABLE} ({FTS_TABLE}, rowid, text) "
+    f"VALUES ('delete', old.id, old.text); "
+    f"INSERT INTO {FTS_TABLE} (rowid, text) VALUES (new.id, new.text); "
+    f"END",
+]
+
+
+def to_match_query(query):
+    """
+    Превращает пользовательский ввод в запрос FTS5: каждое слово
+    в кавычках, слова объединяются по AND. Операторы FTS5 из ввода
+    не попадают в запрос, поэтому он всегда синтаксически верен.
+    """
+    terms = re.findall(r'\w+', query.lower())[:MAX_TERMS]
+    return ' '.join(f'"{term}"' for term in terms) or None
+
+
+def matching_ids(query):
+    """Подзапрос с id постов, подходящих под запрос, для pk__in."""
+    return RawSQL(f'SELECT rowid FROM {FTS_TABLE} WHERE {FTS_TABLE} '
+                  f'MATCH %s', [to_match_query(query)])
+
+
+def ranked_ids(match, offset, limit):
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f'SELECT rowid FROM {FTS_TABLE} WHERE {FTS_TABLE} MATCH %s '
+            f'ORDER BY rank LIMIT %s OFFSET %s', [match, limit, offset])
+        return [row[0] for row in cursor.fetchall()]
+
+
+def search_page(request, query, per_page=POSTS_PER_PAGE):
+    """
+    Страница результатов поиска, упорядоченных по bm25. Ранг вычисляется
+    в запросе, поэтому вместо ключа в курсоре хранится смещение.
+    """
+    match = to_match_query(query)
+    position = decode_cursor(request.GET.get('cursor'), int)
+    offset = 0
+    if position and position[1] > 0:
+        offset = position[1]
+    ids = ranked_ids(match, offset, per_page + 1) if match else []
+    posts = Post.objects.with_related().in_bulk(ids[:per_page])
+    rows = [posts[pk] for pk in ids[:per_page] if pk in posts]
+    next_cursor = previous_cursor = None
+    if len(ids) > per_page:
+        next_cursor = encode_cursor(NEXT, offset + per_page, 0)
+    if offset:
+        previous_cursor = encode_cursor(
+            PREVIOUS, max(offset - per_page, 0), 0)
+    return cursor_page(rows, Paginator(rows, per_page),
+                       next_cursor, previous_cursor)
+
+
+TRIGGERS = [f'{FTS_TABLE}_insert', f'{FTS_TABLE}_delete',
+            f'{FTS_TABLE}_update']
+
+
+def rebuild(using=DEFAULT_DB_ALIAS):
+    """Создаёт недостающие таблицу и триггеры и заново строит индекс."""
+    with connections[using].cursor() as cursor:
+        for statement in SCHEMA:
+            cursor.execute(statement)
+        cursor.execute(
+            f"INSERT INTO {FTS_TABLE} ({FTS_TABLE}) VALUES ('rebuild')")
+
+
+def ensure_triggers(using=DEFAULT_DB_ALIAS):
+    """
+    Возвращает триггеры, если их нет, и перестраивает индекс.
+
+    SQLite пересоздаёт posts_post при AddField и AlterField, и триггеры
+    при этом пропадают молча: поиск перестал бы видеть новые и
+    исправленные посты. Вызывается после каждого migrate. Возвращает
+    True, если индекс пришлось восстановить.
+    """
+    connection = connections[using]
+    if connection.vendor != 'sqlite':
+        return False
+    with connection.cursor() as cursor:
+        cursor.execute(
+            "SELECT type, name FROM sqlite_master "
+            "WHERE name = %s OR name IN (%s, %s, %s)",
+            [FTS_TABLE, *TRIGGERS])
+        found = {name for _, name in cursor.fetchall()}
+    # Без таблицы индекса база ещё не доведена до миграции 0017.
+    if FTS_TABLE not in found or found.issuperset(TRIGGERS):
+        return False
+    rebuild(using)
+    return True
@@ -0,0 +1,174 @@
+import datetime as dt
+import io
+import itertools
+import random
+
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import make_password
+from django.core.files.base import ContentFile
+from django.db import transaction
+from django.db.models import Max
+from django.utils import timezone
+from PIL import Image
+
+from . import bulk, stats, timeline
+from .cache import bump_feed_version
+from .models import Comment, Follow, Group, Post
+
+User = get_user_model()
+
+WORDS = ('день', 'утро', 'письмо', 'дорога', 'работа', 'книга', 'море',
+         'город', 'дом', 'друг', 'вечер', 'музыка', 'поле', 'лес', 'сад',
+         'мысль', 'зима', 'лето', 'река', 'небо', 'дождь', 'снег', 'чай')
+IMAGE_VARIANTS = 20
+
+
+def zipf_weights(count, exponent=1.1):
+    """Веса «богатые богатеют»: у первого элемента больше всех."""
+    return list(itertools.accumulate(
+        1 / (rank + 1) ** exponent for rank in range(count)))
+
+
+def next_pk(model):
+    return (model.objects.aggregate(top=Max('pk'))['top'] or 0) + 1
+
+
+class Seeder:
+    """
+    Генерирует синтетические данные с перекосом, как в живой соцсети:
+    немногие авторы пишут большую часть постов и собирают большую часть
+    подписчиков, а свежие посты комментируют чаще старых.
+
+    Строки вставляются пачками с заранее назначенными pk, поэтому
+    внешние ключи известны без чтения вставленного обратно.
+    """
+
+    def __init__(self, seed=0, batch_size=1000, days=365, stdout=None):
+        self.rng = random.Random(seed)
+        self.batch_size = batch_size
+        self.days = days
+        self.stdout = stdout
+        self.now = timezone.now()
+
+    def log(self, message):
+        if self.stdout is not None:
+            self.stdout.write(message)
+
+    def run(self, users, groups, posts, comments, follows, image_ratio):
+        self.users = self.seed_users(users)
+        self.authors = list(self.users)
+        self.rng.shuffle(self.authors)
+        self.groups = self.seed_groups(groups)
+        self.images = self.seed_images() if image_ratio else []
+        self.posts = self.seed_posts(posts, image_ratio)
+        self.seed_comments(comments)
+        self.seed_follows(follows)
+        bulk.reset_sequences([User, Group, Post, Comment, Follow])
+        # Вставка шла в обход сигналов: ленты и счётчики строим заново.
+        with transaction.atomic():
+            timeline.rebuild()
+        stats.reconcile()
+        bump_feed_version()
+
+    def insert(self, model, objs):
+        with transaction.atomic():
+            bulk.insert(model, objs, self.batch_size)
+        self.log(f'{model._meta.verbose_name_plural}: +{len(objs)}')
+
+    def batches(self, model, count, build):
+        first = next_pk(model)
+        for start in range(0, count, self.batch_size):
+            stop = min(start + self.batch_size, count)
+            self.insert(model, [build(first + number, number)
+                                for number in range(start, stop)])
+        return range(first, first + count)
+
+    def seed_users(self, count):
+        password = make_password(None)
+
+        def build(pk, number):
+            return User(pk=pk, username=f'user{pk}', password=password,
+                        first_name=f'Имя{pk}', last_name=f'Фамилия{pk}',
+                        date_joined=self.now)
+        return self.batches(User, count, build)
+
+    def seed_groups(self, count):
+        def build(pk, number):
+            return Group(pk=pk, title=f'Группа {pk}', slug=f'group-{pk}',
+                         description=self.text(5))
+        return self.batches(Group, count, build)
+
+    def seed_images(self):
+        storage = Post._meta.get_field('image').storage
+        names = []
+        for number in range(IMAGE_VARIANTS):
+            color = tuple(self.rng.randrange(256) for _ in range(3))
+            buffer = io.BytesIO()
+            Image.new('RGB', (960, 640), color).save(buffer, 'PNG')
+            names.append(storage.save(f'posts/seed-{number}.png',
+                                      ContentFile(buffer.getvalue())))
+        return names
+
+    def pub_date(self, number, count):
+        # Посты равномерно растянуты на days дней и идут по возрастанию.
+        return self.now - dt.timedelta(days=self.days) * (1 - number / count)
+
+    def seed_posts(self, count, image_ratio):
+        authors = self.authors
+        author_weights = zipf_weights(len(authors))
+        self.post_count = count
+
+        def build(pk, number):
+            image = ''
+            if self.images and self.rng.random() < image_ratio:
+                image = self.rng.choice(self.images)
+            group = None
+            if self.groups and self.rng.random() < 0.6:
+                group = self.rng.choice(self.groups)
+            author = self.rng.choices(authors, cum_weights=author_weights)[0]
+            return Post(pk=pk, text=self.text(self.rng.randint(5, 80)),
+                        pub_date=self.pub_date(number, count),
+                        author_id=author, group_id=group, image=image)
+        return self.batches(Post, count, build)
+
+    def seed_comments(self, count):
+        if not self.posts:
+            return
+        # Чем новее пост, тем больше у него комментариев.
+        weights = zipf_weights(len(self.posts), exponent=0.8)
+        posts = self.posts[::-1]
+
+        def build(pk, number):
+            index = self.rng.choices(range(len(posts)),
+                                     cum_weights=weights)[0]
+            post_number = len(posts) - 1 - index
+            published = self.pub_date(post_number, self.post_count)
+            created = published + (self.now - published) * self.rng.random()
+            return Comment(pk=pk, post_id=posts[index],
+                           author_id=self.rng.choice(self.users),
+                           text=self.text(self.rng.randint(2, 20)),
+                           created=created)
+        self.batches(Comment, count, build)
+
+    def seed_follows(self, count):
+        # Подписываются в основном на тех же плодовитых авторов.
+        pairs = set()
+        weights = zipf_weights(len(self.authors))
+        attempts = 0
+        while len(pairs) < count and attempts < count * 10:
+            attempts += 1
+            user = self.rng.choice(self.users)
+            author = self.rng.choices(self.authors, cum_weights=weights)[0]
+            if user != author:
+                pairs.add((user, author))
+        pairs = sorted(pairs)
+        first = next_pk(Follow)
+        for start in range(0, len(pairs), self.batch_size):
+            self.insert(Follow, [
+                Follow(pk=first + start + offset, user_id=user,
+                       author_id=author)
+                for offset, (user, author)
+                in enumerate(pairs[start:start + self.batch_size])])
+
+    def text(self, words):
+        return ' '.join(self.rng.choices(WORDS, k=words)).capitalize()
@@ -0,0 +1,96 @@
+from django.contrib.auth import get_user_model
+from django.db.models.signals import post_delete, post_migrate, post_save
+from django.dispatch import receiver
+
+from . import search, stats, thumbnails, timeline
+from .cache import (bump_feed_version, bump_follow_version,
+                    bump_group_version, bump_post_version)
+from .models import Post, Group, Comment, Follow, UserStats
+
+User = get_user_model()
+
+
+@receiver(post_save, sender=Post)
+@receiver(post_delete, sender=Post)
+@receiver(post_save, sender=Comment)
+@receiver(post_delete, sender=Comment)
+@receiver(post_save, sender=Group)
+def invalidate_feed(**kwargs):
+    bump_feed_version()
+
+
+@receiver(post_save, sender=Post)
+def invalidate_post_card(instance, created, **kwargs):
+    if not created:
+        bump_post_version(instance.pk)
+
+
+@receiver(post_save, sender=Group)
+def invalidate_group_cards(instance, created, **kwargs):
+    if not created:
+        bump_group_version(instance.pk)
+
+
+@receiver(post_save, sender=Follow)
+@receiver(post_delete, sender=Follow)
+def invalidate_follows(**kwargs):
+    bump_follow_version()
+
+
+@receiver(post_save, sender=Post)
+def fan_out_post(instance, created, **kwargs):
+    if created:
+        timeline.fan_out(instance)
+
+
+@receiver(post_save, sender=Follow)
+def backfill_timeline(instance, created, **kwargs):
+    if created:
+        timeline.backfill(instance.user_id, instance.author_id)
+
+
+@receiver(post_delete, sender=Follow)
+def prune_timeline(instance, **kwargs):
+    timeline.prune(instance.user_id, instance.author_id)
+
+
+@receiver(post_save, sender=User)
+def create_user_stats(instance, created, raw=False, **kwargs):
+    if created and not raw:
+        UserStats.objects.get_or_create(user=instance)
+
+
+@receiver(post_save, sender=Post)
+def count_new_post(instance, created, **kwargs):
+    if created:
+        stats.change(instance.author_id, posts_count=1)
+
+
+@receiver(post_delete, sender=Post)
+def count_deleted_post(instance, **kwargs):
+    stats.change(instance.author_id, posts_count=-1)
+
+
+@receiver(post_save, sender=Follow)
+def count_new_follow(instance, created, **kwargs):
+    if created:
+        stats.change(instance.author_id, followers_count=1)
+        stats.change(instance.user_id, following_count=1)
+
+
+@receiver(post_delete, sender=Follow)
+def count_deleted_follow(instance, **kwargs):
+    stats.change(instance.author_id, followers_count=-1)
+    stats.change(instance.user_id, following_count=-1)
+
+
+@receiver(post_save, sender=Post)
+def schedule_thumbnails(instance, **kwargs):
+    if instance.image:
+        thumbnails.schedule(instance.image.name)
+
+
+@receiver(post_migrate)
+def restore_search_triggers(sender, using, **kwargs):
+    if sender.name == 'posts':
+        search.ensure_triggers(using)
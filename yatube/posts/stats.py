@@ -0,0 +1,70 @@
+from django.contrib.auth import get_user_model
+from django.db.models import Count, F, IntegerField, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+from .models import Post, Follow, UserStats
+
+User = get_user_model()
+
+
+def _count(queryset, field):
+    counts = (queryset.filter(**{field: OuterRef('pk')})
+              .order_by()
+              .values(field)
+              .annotate(count=Count('pk'))
+              .values('count'))
+    return Coalesce(Subquery(counts, output_field=IntegerField()), 0)
+
+
+def with_actual_counts(users):
+    return users.annotate(
+        actual_followers=_count(Follow.objects, 'author'),
+        actual_following=_count(Follow.objects, 'user'),
+        actual_posts=_count(Post.objects, 'author'),
+    )
+
+
+def recount(user_id):
+    user = with_actual_counts(User.objects.filter(pk=user_id)).get()
+    counts = {
+        'followers_count': user.actual_followers,
+        'following_count': user.actual_following,
+        'posts_count': user.actual_posts,
+    }
+    stats, _ = UserStats.objects.update_or_create(user_id=user_id,
+                                                  defaults=counts)
+    return stats
+
+
+def change(user_id, **deltas):
+    """
+    Атомарно сдвигает счётчики. Записи нет — ничего не делаем: её
+    создаст get_stats или reconcile, а при удалении пользователя новая
+    запись сослалась бы на уже удалённую строку auth_user.
+    """
+    UserStats.objects.filter(user_id=user_id).update(
+        **{field: F(field) + delta for field, delta in deltas.items()})
+
+
+def get_stats(user):
+    try:
+        return user.stats
+    except UserStats.DoesNotExist:
+        user.stats = recount(user.pk)
+        return user.stats
+
+
+def reconcile():
+    """Исправляет расхождения счётчиков, возвращает число исправлений."""
+    fixed = 0
+    users = with_actual_counts(User.objects.select_related('stats'))
+    for user in users.iterator():
+        stats = getattr(user, 'stats', None)
+        if (stats is not None
+                and stats.followers_count == user.actual_followers
+                and stats.following_count == user.actual_following
+                and stats.posts_count == user.actual_posts):
+            continue
+        recount(user.pk)
+        fixed += 1
+    return fixed
@@ -0,0 +1,60 @@
+import hashlib
+import os
+import posixpath
+
+from django.core.files.storage import FileSystemStorage
+from django.utils.deconstruct import deconstructible
+
+# Сколько уровней каталогов и сколько символов хэша на уровень: при
+# 2×2 в каждом каталоге не больше 256 подкаталогов, а не все файлы сразу.
+FANOUT_LEVELS = 2
+FANOUT_WIDTH = 2
+
+
+def content_hash(content):
+    digest = hashlib.sha256()
+    if hasattr(content, 'seek'):
+        content.seek(0)
+    for chunk in content.chunks():
+        digest.update(chunk)
+    if hasattr(content, 'seek'):
+        content.seek(0)
+    return digest.hexdigest()
+
+
+def hashed_name(name, digest):
+    """posts/image.png -> posts/ab/cd/abcd…ef.png"""
+    directory = posixpath.dirname(name)
+    extension = os.path.splitext(name)[1].lower()
+    fanout = [digest[level * FANOUT_WIDTH:(level + 1) * FANOUT_WIDTH]
+              for level in range(FANOUT_LEVELS)]
+    return posixpath.join(directory, *fanout, digest + extension)
+
+
+@deconstructible
+class ContentAddressedStorage(FileSystemStorage):
+    """
+    Хранит файл под именем из хэша содержимого, в каталоге upload_to.
+    Повторная загрузка той же картинки не создаёт копию: сохранение
+    возвращает имя уже лежащего файла. Поэтому файлы общие для постов,
+    и удалять их вместе с постом нельзя.
+    """
+
+    def save(self, name, content, max_length=None):
+        if name is None:
+            name = content.name
+        name = hashed_name(name, content_hash(content))
+        try:
+            return super().save(name, content, max_length)
+        except FileExistsError:
+            return name
+
+    def get_available_name(self, name, max_length=None):
+        # Занятое имя значит то же содержимое: вместо переименования
+        # прерываем запись, и save() возвращает имя готового файла.
+        if self.exists(name):
+            raise FileExistsError(name)
+        return name
+
+
+post_image_storage = ContentAddressedStorage()
@@ -0,0 +1,41 @@
+from django.db import IntegrityError, transaction
+
+from . import stats, timeline
+from .cache import bump_follow_version
+from .models import Follow
+
+
+def follow(user, author):
+    """
+    Подписывает user на author одним INSERT.
+
+    Повторная подписка упирается в ограничение unique_follow, поэтому
+    двойной клик или параллельные запросы не создают дубликатов.
+    Возвращает True, если подписка создана.
+    """
+    try:
+        with transaction.atomic():
+            Follow.objects.create(user=user, author=author)
+    except IntegrityError:
+        return False
+    return True
+
+
+def unfollow(user, author):
+    """
+    Отписывает user от author одним DELETE.
+
+    QuerySet.delete() из-за обработчиков post_delete сначала выбрал бы
+    строки SELECT'ом, поэтому удаляем напрямую и по rowcount делаем то
+    же, что обработчики: чистим ленту, сдвигаем счётчики и версию
+    подписок. Обработчики остаются для каскадов и удаления из админки.
+    Возвращает True, если подписка была.
+    """
+    deleted = Follow.objects.filter(
+        user=user, author=author)._raw_delete(Follow.objects.db)
+    if deleted:
+        timeline.prune(user.pk, author.pk)
+        stats.change(author.pk, followers_count=-1)
+        stats.change(user.pk, following_count=-1)
+        bump_follow_version()
+    return bool(deleted)
@@ -0,0 +1,14 @@
+from django import template
+
+from posts import fragments
+
+register = template.Library()
+
+
+@register.simple_tag(takes_context=True)
+def user_fragment(context, name, **kwargs):
+    """
+    Фрагмент, который рисуется для каждого пользователя отдельно:
+    в кэшированном каркасе страницы на его месте остаётся метка.
+    """
+    return fragments.render(context['request'], name, **kwargs)
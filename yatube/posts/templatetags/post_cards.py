@@ -0,0 +1,60 @@
+from django import template
+from django.conf import settings
+from django.core.cache import cache
+from django.template.loader import render_to_string
+from django.utils.safestring import mark_safe
+
+from posts import fragments, thumbnails
+from posts.cache import (group_version_key, post_version_key, record,
+                         versions)
+
+register = template.Library()
+
+EDIT_BUTTON = mark_safe('<!--post-edit-button-->')
+
+
+def _render(post):
+    html = render_to_string('includes/post_card.html', {
+        'post': post,
+        'edit_button': EDIT_BUTTON,
+    })
+    button = render_to_string('includes/post_edit_button.html', {
+        'username': post.author.username,
+        'post_id': post.pk,
+    })
+    return html, button
+
+
+@register.simple_tag(takes_context=True)
+def post_card(context, post):
+    """
+    Карточка поста из кэша фрагментов.
+
+    Ключ содержит версию поста (меняется при правке), версию группы
+    (при переименовании) и число комментариев, так что устаревшая
+    карточка никогда не попадает в ключ. Карточка одна для всех
+    пользователей: кнопку «Редактировать» автору подставляем здесь.
+    """
+    keys = [post_version_key(post.pk)]
+    if post.group_id:
+        keys.append(group_version_key(post.group_id))
+    key = 'posts:card:{}:{}:{}'.format(
+        post.pk, ':'.join(str(value) for value in versions(keys).values()),
+        getattr(post, 'comment_count', 0))
+    card = cache.get(key)
+    record('post_card', card is not None)
+    if card is None:
+        card = _render(post)
+        # Пока миниатюра не готова, в карточке заглушка — её не кэшируем.
+        if not post.image or thumbnails.ready(post.image.name):
+            cache.set(key, card, settings.POST_CARD_CACHE_TIMEOUT)
+    html, button = card
+    request = context.get('request')
+    if request is not None and fragments.is_skeleton(request):
+        # Каркас страницы общий для всех: кнопку подставит fill().
+        return mark_safe(html.replace(EDIT_BUTTON, fragments.marker(
+            'post_edit_button', post_id=post.pk, author_id=post.author_id,
+            username=post.author.username)))
+    user = context.get('user')
+    is_author = user is not None and user.pk == post.author_id
+    return mark_safe(html.replace(EDIT_BUTTON, button if is_author else ''))
@@ -0,0 +1,19 @@
+from django import template
+
+from posts import thumbnails
+
+register = template.Library()
+
+
+@register.simple_tag
+def post_thumbnails(image):
+    """
+    Возвращает готовые миниатюры для srcset, не генерируя их в запросе.
+    Если миниатюр ещё нет, ставит их в очередь и возвращает None.
+    """
+    if not image:
+        return None
+    sources = thumbnails.ready(image.name)
+    if sources is None:
+        thumbnails.schedule(image.name)
+    return sources
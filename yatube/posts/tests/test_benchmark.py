@@ -0,0 +1,68 @@
+import io
+import json
+import os
+import shutil
+import tempfile
+from collections import Counter
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+
+from posts.models import Comment, Follow, Group, Post, TimelineEntry
+from posts.seeding import Seeder
+
+User = get_user_model()
+
+MEDIA_ROOT = tempfile.mkdtemp(dir=settings.BASE_DIR)
+
+
+@override_settings(MEDIA_ROOT=MEDIA_ROOT)
+class BenchmarkTest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        Seeder(seed=1, batch_size=50).run(
+            users=40, groups=3, posts=300, comments=400, follows=100,
+            image_ratio=0.1)
+
+    @classmethod
+    def tearDownClass(cls):
+        shutil.rmtree(MEDIA_ROOT, ignore_errors=True)
+        super().tearDownClass()
+
+    def setUp(self):
+        cache.clear()
+
+    def test_seeder_creates_skewed_data(self):
+        """Генератор создаёт связные данные с перекосом по авторам."""
+        self.assertEqual(User.objects.count(), 40)
+        self.assertEqual(Group.objects.count(), 3)
+        self.assertEqual(Comment.objects.count(), 400)
+        self.assertEqual(Follow.objects.count(), 100)
+        posts_per_author = Counter(
+            Post.objects.values_list('author', flat=True))
+        top, median = sorted(posts_per_author.values())[-1], 300 / 40
+        self.assertGreater(top, 3 * median)
+        self.assertTrue(Post.objects.exclude(image='').exists())
+        oldest = Post.objects.order_by('pk').first()
+        newest = Post.objects.order_by('pk').last()
+        self.assertLess(oldest.pub_date, newest.pub_date)
+        self.assertTrue(TimelineEntry.objects.exists())
+        author = User.objects.get(pk=posts_per_author.most_common(1)[0][0])
+        self.assertEqual(author.stats.posts_count, top)
+
+    def test_benchmark_saves_results(self):
+        """Бенчмарк замеряет страницы и сохраняет результат в JSON."""
+        path = os.path.join(MEDIA_ROOT, 'run.json')
+        call_command('benchmark_views', '--requests', '2', '--warmup', '0',
+                     '--output', path, stdout=io.StringIO())
+        with open(path, encoding='utf-8') as run:
+            results = json.load(run)['results']
+        self.assertIn('follow_index', results)
+        for name, result in results.items():
+            with self.subTest(name=name):
+                self.assertLessEqual(result['p50_ms'], result['p99_ms'])
+                self.assertGreaterEqual(result['queries'], 0)
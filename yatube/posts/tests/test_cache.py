@@ -1,8 +1,12 @@
+from unittest import mock
+
 from django.contrib.auth import get_user_model
+from django.core.cache import cache
 from django.test import Client, TestCase
 from django.urls import reverse
 
-from posts.models import Post, Group
+from posts.cache import cache_stats, feed_version
+from posts.models import Post, Group, Comment
 
 User = get_user_model()
 
@@ -19,8 +23,10 @@ class CacheTest(TestCase):
         )
 
     def setUp(self):
+        cache.clear()
         self.client = Client()
         self.client.force_login(self.user)
+        self.guest_client = Client()
 
     def test_cache(self):
         form_data = {
@@ -41,3 +47,44 @@ class CacheTest(TestCase):
         self.assertTrue(created_post.exists())
         created_post.delete()
         self.assertIn('Brand new post for test', response.content.decode())
+
+    def test_index_served_from_cache_between_writes(self):
+        """Повторный запрос ленты не обращается к базе."""
+        Post.objects.create(text='Закэшированный пост', author=self.user)
+        self.guest_client.get(reverse('index'))
+        hits = cache_stats().get(('feed', 'hits'), 0)
+        with self.assertNumQueries(0):
+            response = self.guest_client.get(reverse('index'))
+        self.assertIn('Закэшированный пост', response.content.decode())
+        self.assertEqual(cache_stats()[('feed', 'hits')], hits + 1)
+
+    def test_writes_invalidate_index_cache(self):
+        """Создание, правка, удаление и комментарий сбрасывают кэш."""
+        post = Post.objects.create(text='Первая версия', author=self.user)
+        self.guest_client.get(reverse('index'))
+
+        post.text = 'Вторая версия'
+        post.save()
+        content = self.guest_client.get(reverse('index')).content.decode()
+        self.assertIn('Вторая версия', content)
+
+        Comment.objects.create(post=post, author=self.user, text='Отзыв')
+        content = self.guest_client.get(reverse('index')).content.decode()
+        self.assertIn('Комментариев: 1', content)
+
+        Post.objects.create(text='Новый пост', author=self.user)
+        content = self.guest_client.get(reverse('index')).content.decode()
+        self.assertIn('Новый пост', content)
+
+        post.delete()
+        content = self.guest_client.get(reverse('index')).content.decode()
+        self.assertNotIn('Вторая версия', content)
+
+    def test_feed_version_bumped_again_on_commit(self):
+        """Версия ленты сдвигается ещё раз после коммита транзакции."""
+        with mock.patch('posts.cache.transaction.on_commit') as on_commit:
+            Post.objects.create(text='Пост в транзакции', author=self.user)
+        version = feed_version()
+        for call in on_commit.call_args_list:
+            call[0][0]()
+        self.assertGreater(feed_version(), version)
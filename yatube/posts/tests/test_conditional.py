@@ -0,0 +1,109 @@
+import time
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import Client, TestCase
+from django.urls import reverse
+from django.utils.http import http_date
+
+from posts.models import Post, Group, Comment
+from posts.subscriptions import follow
+
+User = get_user_model()
+
+
+class ConditionalGetTest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.author = User.objects.create_user(username='Author')
+        cls.reader = User.objects.create_user(username='Reader')
+        cls.group = Group.objects.create(
+            title='TestTitle',
+            slug='test-slug',
+            description='TestDescription'
+        )
+        cls.post = Post.objects.create(text='Пост', author=cls.author,
+                                       group=cls.group)
+        cls.urls = [
+            reverse('index'),
+            reverse('group_posts', kwargs={'slug': 'test-slug'}),
+            reverse('profile', kwargs={'username': 'Author'}),
+            reverse('post', kwargs={'username': 'Author',
+                                    'post_id': cls.post.id}),
+        ]
+
+    def setUp(self):
+        cache.clear()
+        self.guest_client = Client()
+        self.authorized_client = Client()
+        self.authorized_client.force_login(self.reader)
+
+    def revalidate(self, client, url):
+        etag = client.get(url)['ETag']
+        return etag, client.get(url, HTTP_IF_NONE_MATCH=etag)
+
+    def test_unchanged_pages_answer_not_modified(self):
+        """Неизменившаяся страница отдаёт 304 без запросов к базе."""
+        for url in self.urls:
+            with self.subTest(url=url):
+                etag = self.guest_client.get(url)['ETag']
+                with self.assertNumQueries(0):
+                    response = self.guest_client.get(
+                        url, HTTP_IF_NONE_MATCH=etag)
+                self.assertEqual(response.status_code, 304)
+                self.assertFalse(response.templates)
+
+    def test_changes_make_pages_modified(self):
+        """Новый пост или комментарий меняют ETag страниц."""
+        etags = {url: self.guest_client.get(url)['ETag']
+                 for url in self.urls}
+        Comment.objects.create(post=self.post, author=self.reader,
+                               text='Комментарий')
+        for url, etag in etags.items():
+            with self.subTest(url=url):
+                response = self.guest_client.get(
+                    url, HTTP_IF_NONE_MATCH=etag)
+                self.assertEqual(response.status_code, 200)
+
+    def test_viewer_and_follows_change_etag(self):
+        """ETag зависит от пользователя и его подписок."""
+        profile_url = self.urls[2]
+        guest_etag = self.guest_client.get(profile_url)['ETag']
+        etag, response = self.revalidate(self.authorized_client, profile_url)
+        self.assertNotEqual(etag, guest_etag)
+        self.assertEqual(response.status_code, 304)
+        follow(self.reader, self.author)
+        response = self.authorized_client.get(
+            profile_url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertContains(response, 'Отписаться')
+
+    def test_last_modified_only_for_guests(self):
+        """Дата изменения отдаётся только анонимным посетителям."""
+        url = self.urls[0]
+        Post.objects.create(text='Ещё пост', author=self.author)
+        with mock.patch('posts.conditional.time.time',
+                        return_value=time.time() + 2):
+            last_modified = self.guest_client.get(url)['Last-Modified']
+            response = self.guest_client.get(
+                url, HTTP_IF_MODIFIED_SINCE=last_modified)
+            self.assertEqual(response.status_code, 304)
+            self.assertFalse(
+                self.authorized_client.get(url).has_header('Last-Modified'))
+
+    def test_no_last_modified_within_the_write_second(self):
+        """Пока идёт секунда последней записи, Last-Modified не отдаётся:
+        вторая запись в ту же секунду его бы не сдвинула."""
+        url = self.urls[0]
+        now = time.time()
+        with mock.patch('posts.conditional.time.time', return_value=now):
+            Post.objects.create(text='Первый', author=self.author)
+            response = self.guest_client.get(url)
+            self.assertFalse(response.has_header('Last-Modified'))
+            Post.objects.create(text='Второй', author=self.author)
+            response = self.guest_client.get(
+                url, HTTP_IF_MODIFIED_SINCE=http_date(now))
+            self.assertEqual(response.status_code, 200)
+            self.assertContains(response, 'Второй')
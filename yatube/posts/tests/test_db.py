@@ -0,0 +1,96 @@
+import shutil
+import tempfile
+from unittest import mock
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.db import OperationalError
+from django.test import RequestFactory, TransactionTestCase, override_settings
+from django.urls import reverse
+
+from posts.db import retry_on_locked
+from posts.models import Post
+
+User = get_user_model()
+
+MEDIA_ROOT = tempfile.mkdtemp(dir=settings.BASE_DIR)
+SMALL_GIF = (
+    b'\x47\x49\x46\x38\x39\x61\x02\x00'
+    b'\x01\x00\x80\x00\x00\x00\x00\x00'
+    b'\xFF\xFF\xFF\x21\xF9\x04\x00\x00'
+    b'\x00\x00\x00\x2C\x00\x00\x00\x00'
+    b'\x02\x00\x01\x00\x00\x02\x02\x0C'
+    b'\x0A\x00\x3B'
+)
+
+
+class RetryOnLockedTest(TransactionTestCase):
+    def setUp(self):
+        self.request = RequestFactory().post('/new/')
+
+    @mock.patch('posts.db.time.sleep')
+    def test_locked_view_is_retried(self, sleep):
+        """Ошибка «database is locked» повторяет view в новой транзакции."""
+        calls = []
+
+        @retry_on_locked
+        def view(request):
+            calls.append(request)
+            if len(calls) < 3:
+                raise OperationalError('database is locked')
+            return 'ok'
+
+        self.assertEqual(view(self.request), 'ok')
+        self.assertEqual(len(calls), 3)
+        self.assertEqual(sleep.call_count, 2)
+
+    @mock.patch('posts.db.time.sleep')
+    def test_other_errors_and_last_attempt_are_raised(self, sleep):
+        """Прочие ошибки и последняя неудачная попытка не скрываются."""
+        @retry_on_locked
+        def broken(request):
+            raise OperationalError('no such table: posts_post')
+
+        @retry_on_locked
+        def locked(request):
+            raise OperationalError('database is locked')
+
+        with self.assertRaisesMessage(OperationalError, 'no such table'):
+            broken(self.request)
+        self.assertEqual(sleep.call_count, 0)
+        with self.assertRaisesMessage(OperationalError, 'locked'):
+            locked(self.request)
+
+
+@override_settings(MEDIA_ROOT=MEDIA_ROOT)
+class RetryUploadTest(TransactionTestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username='TestUser')
+        self.client.force_login(self.user)
+
+    @classmethod
+    def tearDownClass(cls):
+        shutil.rmtree(MEDIA_ROOT, ignore_errors=True)
+        super().tearDownClass()
+
+    @mock.patch('posts.db.time.sleep')
+    def test_upload_is_read_again_on_retry(self, sleep):
+        """Повтор new_post заново читает картинку с начала файла."""
+        save = Post.save
+        attempts = []
+
+        def locked_once(post, *args, **kwargs):
+            attempts.append(post)
+            if len(attempts) == 1:
+                raise OperationalError('database is locked')
+            return save(post, *args, **kwargs)
+
+        upload = SimpleUploadedFile('small.gif', SMALL_GIF, 'image/gif')
+        with mock.patch.object(Post, 'save', locked_once):
+            response = self.client.post(
+                reverse('new_post'), {'text': 'Пост', 'image': upload})
+        self.assertRedirects(response, reverse('index'))
+        self.assertEqual(len(attempts), 2)
+        post = Post.objects.get()
+        self.assertTrue(post.image)
@@ -0,0 +1,91 @@
+import csv
+import datetime as dt
+import gzip
+import io
+import json
+import os
+import tempfile
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.test import TestCase
+
+from posts.models import Follow, Post
+
+User = get_user_model()
+
+
+class ExportDataTest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.author = User.objects.create_user(username='Author')
+        cls.reader = User.objects.create_user(username='Reader')
+        Follow.objects.create(user=cls.reader, author=cls.author)
+        cls.posts = []
+        for day in (3, 1, 2, 5):
+            post = Post.objects.create(text=f'День {day}', author=cls.author)
+            Post.objects.filter(pk=post.pk).update(
+                pub_date=dt.datetime(2021, 1, day, tzinfo=dt.timezone.utc))
+            cls.posts.append(post)
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.addCleanup(self.directory.cleanup)
+
+    def export(self, *args, name='export.jsonl'):
+        path = os.path.join(self.directory.name, name)
+        call_command('export_data', *args[:1], path, *args[1:],
+                     '--chunk-size', '2', stderr=io.StringIO())
+        return path
+
+    def read_jsonl(self, path):
+        with open(path, encoding='utf-8') as export:
+            return [json.loads(line) for line in export]
+
+    def interrupt(self, path, keep):
+        """Оставляет в файле первые keep строк, как после обрыва."""
+        with open(path, encoding='utf-8', newline='') as export:
+            lines = export.readlines()[:keep]
+        with open(path, 'w', encoding='utf-8', newline='') as export:
+            export.writelines(lines)
+
+    def test_export_resumes_after_id(self):
+        """Выгрузка идёт по id и дописывается после указанного id."""
+        path = self.export('posts')
+        rows = self.read_jsonl(path)
+        ids = [post.pk for post in self.posts]
+        self.assertEqual([row['id'] for row in rows], ids)
+        self.assertEqual(rows[0]['text'], 'День 3')
+        self.interrupt(path, 2)
+        self.export('posts', '--after-id', str(ids[1]))
+        self.assertEqual([row['id'] for row in self.read_jsonl(path)], ids)
+
+    def test_resumed_csv_has_one_header(self):
+        """Продолжение CSV не повторяет строку заголовка."""
+        path = self.export('posts', '--format', 'csv', name='posts.csv')
+        self.interrupt(path, 2)
+        self.export('posts', '--format', 'csv', '--after-id',
+                    str(self.posts[0].pk), name='posts.csv')
+        with open(path, encoding='utf-8', newline='') as export:
+            rows = list(csv.reader(export))
+        self.assertEqual(rows[0][0], 'id')
+        self.assertEqual([row[0] for row in rows[1:]],
+                         [str(post.pk) for post in self.posts])
+
+    def test_export_filters_by_date(self):
+        """С --since/--until посты выгружаются по дате публикации."""
+        path = self.export('posts', '--since', '2021-01-02',
+                           '--until', '2021-01-05')
+        self.assertEqual([row['text'] for row in self.read_jsonl(path)],
+                         ['День 2', 'День 3'])
+
+    def test_export_gzip_csv(self):
+        """Подписки выгружаются в CSV со сжатием gzip."""
+        path = self.export('follows', '--format', 'csv',
+                           name='follows.csv.gz')
+        with gzip.open(path, 'rt', encoding='utf-8') as export:
+            rows = list(csv.reader(export))
+        self.assertEqual(rows[0], ['id', 'user_id', 'author_id'])
+        self.assertEqual(rows[1][1:], [str(self.reader.pk),
+                                       str(self.author.pk)])
@@ -1,14 +1,17 @@
+import io
 import shutil
 import tempfile
 
 from django.conf import settings
-from django.test import Client, TestCase
+from django.test import Client, TestCase, override_settings
 from django.urls import reverse
 from django.contrib.auth import get_user_model
 from django.core.files.uploadedfile import SimpleUploadedFile
 
 from http import HTTPStatus
 
+from PIL import Image
+
 from posts.models import Post, Group
 
 User = get_user_model()
@@ -88,9 +91,29 @@ class PostFormTests(TestCase):
             text='Текст из формы',
             author=self.user,
             group=self.group,
-            image='posts/small.gif').exists())
+            image__regex=r'^posts/[0-9a-f]{2}/[0-9a-f]{2}/[0-9a-f]{64}\.gif$',
+        ).exists())
         self.assertEqual(response.status_code, HTTPStatus.OK)
 
+    @override_settings(POST_IMAGE_MAX_SIZE=100)
+    def test_uploaded_image_is_normalized(self):
+        """Картинка поворачивается по EXIF, уменьшается и теряет EXIF."""
+        buffer = io.BytesIO()
+        exif = Image.Exif()
+        exif[0x0112] = 6  # Orientation: повернуть на 90° по часовой
+        exif[0x010F] = 'PhoneMaker'
+        Image.new('RGB', (400, 200)).save(buffer, 'JPEG', exif=exif)
+        photo = SimpleUploadedFile('photo.jpg', buffer.getvalue(),
+                                   'image/jpeg')
+        self.authorized_client.post(
+            reverse('new_post'),
+            data={'text': 'Фото с телефона', 'image': photo})
+        post = Post.objects.get(text='Фото с телефона')
+        with Image.open(post.image.path) as stored:
+            self.assertEqual(stored.format, 'JPEG')
+            self.assertEqual(stored.size, (50, 100))
+            self.assertFalse(stored.getexif())
+
     def test_unauthorized_user_cant_create_post(self):
         post_count = Post.objects.count()
         form_data = {
@@ -0,0 +1,81 @@
+import datetime as dt
+import io
+import json
+import os
+import tempfile
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.test import TestCase
+
+from posts.management.commands.import_fixture import iter_records
+from posts.models import Comment, Follow, Group, Post, TimelineEntry
+
+User = get_user_model()
+
+FIXTURE = [
+    {'model': 'posts.post', 'pk': 7, 'fields': {
+        'text': 'Старый пост', 'pub_date': '1854-03-14T00:00:00Z',
+        'author': 2, 'group': 1, 'image': ''}},
+    {'model': 'sessions.session', 'pk': 'abc', 'fields': {
+        'session_data': '', 'expire_date': '2021-01-01T00:00:00Z'}},
+    {'model': 'auth.user', 'pk': 2, 'fields': {
+        'password': '', 'username': 'leo', 'last_login': None,
+        'is_superuser': False, 'first_name': '', 'last_name': '',
+        'email': '', 'is_staff': False, 'is_active': True,
+        'date_joined': '2019-10-05T21:37:36.487Z',
+        'groups': [], 'user_permissions': []}},
+    {'model': 'auth.user', 'pk': 3, 'fields': {
+        'password': '', 'username': 'reader', 'last_login': None,
+        'is_superuser': False, 'first_name': '', 'last_name': '',
+        'email': '', 'is_staff': False, 'is_active': True,
+        'date_joined': '2019-10-05T21:37:36.487Z',
+        'groups': [], 'user_permissions': []}},
+    {'model': 'posts.group', 'pk': 1, 'fields': {
+        'title': 'Art', 'slug': 'art', 'description': 'about art'}},
+    {'model': 'posts.comment', 'pk': 1, 'fields': {
+        'post': 7, 'author': 3, 'text': 'Комментарий',
+        'created': '2021-05-07T01:56:28.206Z'}},
+    {'model': 'posts.follow', 'pk': 9, 'fields': {'user': 3, 'author': 2}},
+]
+
+
+class ImportFixtureTest(TestCase):
+    def import_fixture(self, records, *args):
+        out = io.StringIO()
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'dump.json')
+            with open(path, 'w', encoding='utf-8') as fixture:
+                json.dump(records, fixture, ensure_ascii=False, indent=1)
+            call_command('import_fixture', path, '--chunk-size', '2',
+                         *args, stdout=out)
+        return out.getvalue().splitlines()[-1]
+
+    def test_iter_records_reads_small_chunks(self):
+        """Записи читаются целиком, даже если разрезаны между кусками."""
+        stream = io.StringIO(json.dumps(FIXTURE, ensure_ascii=False))
+        self.assertEqual(list(iter_records(stream, read_size=7)), FIXTURE)
+
+    def test_import_keeps_rows_and_dates(self):
+        """Команда загружает записи в любом порядке и сохраняет даты."""
+        self.import_fixture(FIXTURE)
+        post = Post.objects.get(pk=7)
+        self.assertEqual(post.pub_date,
+                         dt.datetime(1854, 3, 14, tzinfo=dt.timezone.utc))
+        self.assertEqual(post.author.username, 'leo')
+        self.assertEqual(post.group, Group.objects.get(slug='art'))
+        self.assertTrue(Comment.objects.filter(post=post).exists())
+        self.assertTrue(Follow.objects.filter(user_id=3, author_id=2))
+        self.assertTrue(TimelineEntry.objects.filter(user_id=3, post=post))
+        self.assertEqual(User.objects.get(pk=2).stats.posts_count, 1)
+
+    def test_skip_existing_rows(self):
+        """С --skip-existing повторная загрузка не падает на занятых pk."""
+        self.import_fixture(FIXTURE)
+        extra = {'model': 'posts.group', 'pk': 2, 'fields': {
+            'title': 'Music', 'slug': 'music', 'description': ''}}
+        summary = self.import_fixture(FIXTURE + [extra], '--skip-existing')
+        self.assertEqual(Post.objects.count(), 1)
+        self.assertIn('Записано строк: 1,', summary)
+        self.assertIn('пропущено с занятым pk: 6,', summary)
+        self.assertIn('пропущено записей других моделей: 1,', summary)
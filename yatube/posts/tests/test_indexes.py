@@ -0,0 +1,33 @@
+from django.contrib.auth import get_user_model
+from django.test import TestCase
+
+from posts.models import Post, Group, Comment
+from posts.queryplans import explain, feed_queries
+
+User = get_user_model()
+
+
+class FeedIndexesTest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='TestUser')
+        cls.group = Group.objects.create(title='TestTitle', slug='test-slug')
+        cls.post = Post.objects.create(text='TestText', author=cls.user,
+                                       group=cls.group)
+        Comment.objects.create(post=cls.post, author=cls.user, text='Текст')
+
+    def test_feeds_are_ordered_by_index(self):
+        """Ленты читаются по составным индексам без сортировки в памяти."""
+        indexes = {
+            'profile': 'post_author_pub_date',
+            'group_posts': 'post_group_pub_date',
+            'comments': 'comment_post_created',
+        }
+        queries = feed_queries(self.user.pk, self.group.pk, self.post.pk)
+        for name, queryset in queries.items():
+            with self.subTest(name=name):
+                plan = ' '.join(explain(queryset))
+                self.assertNotIn('TEMP B-TREE', plan)
+                if name in indexes:
+                    self.assertIn(indexes[name], plan)
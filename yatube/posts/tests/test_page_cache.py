@@ -0,0 +1,91 @@
+import gzip
+from unittest import mock
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import Client, TestCase, override_settings
+from django.urls import reverse
+
+from posts.cache import cache_stats
+from posts.models import Post
+from posts.subscriptions import follow
+from yatube.cache_backends import SQLiteCache
+
+User = get_user_model()
+
+
+@override_settings(PAGE_CACHE=True)
+class PageCacheTest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.author = User.objects.create_user(username='Author')
+        cls.reader = User.objects.create_user(username='Reader')
+        follow(cls.reader, cls.author)
+        cls.post = Post.objects.create(text='Первый пост', author=cls.author)
+
+    def setUp(self):
+        cache.clear()
+        self.author_client = Client()
+        self.author_client.force_login(self.author)
+        self.reader_client = Client()
+        self.reader_client.force_login(self.reader)
+
+    def hits(self):
+        return cache_stats().get(('page', 'hits'), 0)
+
+    def test_anonymous_page_is_served_from_cache_gzipped(self):
+        """Аноним получает готовую страницу без запросов к базе."""
+        url = reverse('profile', args=['Author'])
+        self.client.get(url)
+        with self.assertNumQueries(0):
+            response = self.client.get(url, HTTP_ACCEPT_ENCODING='gzip')
+        self.assertEqual(response['Content-Encoding'], 'gzip')
+        self.assertIn('Accept-Encoding', response['Vary'])
+        html = gzip.decompress(response.content).decode()
+        self.assertIn('Первый пост', html)
+        self.assertIn('Войти', html)
+
+    def test_skeleton_is_shared_and_fragments_are_personal(self):
+        """Каркас общий, а меню и кнопки у каждого пользователя свои."""
+        url = reverse('profile', args=['Author'])
+        hits = self.hits()
+        reader_page = self.reader_client.get(url)
+        author_page = self.author_client.get(url)
+        self.assertEqual(self.hits(), hits + 1)
+        self.assertContains(reader_page, 'Пользователь: Reader.')
+        self.assertContains(reader_page, 'Отписаться')
+        self.assertNotContains(reader_page, 'Редактировать')
+        self.assertContains(author_page, 'Пользователь: Author.')
+        self.assertContains(author_page, 'Подписаться')
+        self.assertContains(author_page, 'Редактировать')
+        self.assertNotContains(author_page, '<!--fragment:')
+        anonymous_page = self.client.get(url)
+        self.assertContains(anonymous_page, 'Войти')
+        self.assertNotContains(anonymous_page, 'Reader')
+
+    def test_new_post_invalidates_pages(self):
+        """Новый пост сразу виден на закэшированных страницах."""
+        self.client.get(reverse('index'))
+        self.reader_client.get(reverse('index'))
+        Post.objects.create(text='Второй пост', author=self.author)
+        self.assertContains(self.client.get(reverse('index')), 'Второй пост')
+        self.assertContains(self.reader_client.get(reverse('index')),
+                            'Второй пост')
+
+    def test_page_is_shared_between_workers(self):
+        """Страницу, закэшированную одним воркером, отдаёт и другой."""
+        url = reverse('index')
+        self.client.get(url)
+        # Другой процесс: свой экземпляр бэкенда и своё соединение
+        # с тем же файлом кэша.
+        config = settings.CACHES['default']
+        worker_cache = SQLiteCache(config['LOCATION'], config)
+        hits = self.hits()
+        with mock.patch('posts.page_cache.cache', worker_cache), \
+                mock.patch('posts.cache.cache', worker_cache), \
+                self.assertNumQueries(0):
+            response = self.client.get(url)
+        self.assertEqual(self.hits(), hits + 1)
+        self.assertContains(response, 'Первый пост')
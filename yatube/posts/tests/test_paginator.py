@@ -1,4 +1,8 @@
+import base64
+import json
+
 from django.contrib.auth import get_user_model
+from django.core.cache import cache
 from django.test import Client, TestCase
 from django.urls import reverse
 from posts.models import Post, Group
@@ -25,14 +29,39 @@ class PaginatorViewsTest(TestCase):
                 author=cls.user
             )
 
+    def setUp(self):
+        cache.clear()
+
     def test_first_page_contains_ten_records(self):
         response = self.client.get(reverse('index'))
         # Проверка: количество постов на первой странице равно 10.
         self.assertEqual(len(response.context.get('page').object_list), 10)
 
+    def test_malformed_cursor_returns_first_page(self):
+        """Курсор с чужим значением ключа не роняет ленту."""
+        first_page = list(
+            self.client.get(reverse('index')).context['page'])
+        cursors = {
+            'bad date': ['n', '2020-13-45T00:00:00', 1],
+            'not a date': ['n', 'abc', 1],
+            'list': ['n', [1], 1],
+            'dict': ['n', {}, 1],
+            'not a list': {},
+        }
+        for name, raw in cursors.items():
+            with self.subTest(name):
+                cursor = base64.urlsafe_b64encode(
+                    json.dumps(raw).encode()).decode()
+                response = self.client.get(
+                    reverse('index') + '?cursor=' + cursor)
+                self.assertEqual(response.status_code, 200)
+                self.assertEqual(list(response.context['page']), first_page)
+
     def test_second_page_contains_three_records(self):
         # Проверка: на второй странице должно быть три поста.
-        response = self.client.get(reverse('index') + '?page=2')
+        first_page = self.client.get(reverse('index')).context['page']
+        response = self.client.get(
+            reverse('index') + '?cursor=' + first_page.next_cursor)
         self.assertEqual(len(response.context.get('page').object_list), 3)
 
     def test_first_group_page_contains_ten_records(self):
@@ -43,7 +72,34 @@ class PaginatorViewsTest(TestCase):
 
     def test_group_second_page_contains_three_records(self):
         # Проверка: на второй странице должно быть три поста.
-        response = self.client.get(reverse('group_posts',
-                                           kwargs={'slug': 'test-slug'})
-                                   + '?page=2')
+        url = reverse('group_posts', kwargs={'slug': 'test-slug'})
+        first_page = self.client.get(url).context['page']
+        response = self.client.get(url + '?cursor=' + first_page.next_cursor)
         self.assertEqual(len(response.context.get('page').object_list), 3)
+
+    def test_cursor_pages_walk_back_and_forth(self):
+        """
+        Курсоры ведут по ленте без пропусков и повторов в обе стороны.
+        """
+        url = reverse('index')
+        first_page = self.client.get(url).context['page']
+        second_page = self.client.get(
+            url + '?cursor=' + first_page.next_cursor).context['page']
+        self.assertFalse(first_page.has_previous())
+        self.assertFalse(second_page.has_next())
+        self.assertEqual(
+            list(first_page) + list(second_page),
+            list(Post.objects.order_by('-pub_date', '-pk')))
+        back_page = self.client.get(
+            url + '?cursor=' + second_page.previous_cursor).context['page']
+        self.assertEqual(list(back_page), list(first_page))
+        self.assertFalse(back_page.has_previous())
+
+    def test_broken_cursor_returns_first_page(self):
+        response = self.client.get(reverse('index') + '?cursor=broken')
+        self.assertEqual(len(response.context.get('page').object_list), 10)
+
+    def test_page_does_not_count_posts(self):
+        """Страница ленты выбирается одним запросом без COUNT(*)."""
+        with self.assertNumQueries(1):
+            self.client.get(reverse('index'))
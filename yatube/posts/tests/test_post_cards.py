@@ -0,0 +1,59 @@
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import Client, TestCase
+from django.urls import reverse
+
+from posts.cache import cache_stats
+from posts.models import Post, Group, Comment
+
+User = get_user_model()
+
+
+class PostCardCacheTest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.author = User.objects.create_user(username='Author')
+        cls.reader = User.objects.create_user(username='Reader')
+        cls.group = Group.objects.create(
+            title='TestTitle',
+            slug='test-slug',
+            description='TestDescription'
+        )
+
+    def setUp(self):
+        cache.clear()
+        self.post = Post.objects.create(text='Первый текст',
+                                        author=self.author, group=self.group)
+        self.url = reverse('group_posts', kwargs={'slug': 'test-slug'})
+        self.author_client = Client()
+        self.author_client.force_login(self.author)
+        self.reader_client = Client()
+        self.reader_client.force_login(self.reader)
+
+    def hits(self):
+        return cache_stats().get(('post_card', 'hits'), 0)
+
+    def test_card_is_shared_between_users(self):
+        """Карточка рендерится один раз, кнопку правки видит только автор."""
+        hits = self.hits()
+        self.assertNotContains(self.reader_client.get(self.url),
+                               'Редактировать')
+        self.assertContains(self.author_client.get(self.url),
+                            'Редактировать')
+        self.assertEqual(self.hits(), hits + 1)
+
+    def test_card_invalidation(self):
+        """Правка поста, новый комментарий и переименование группы видны."""
+        self.reader_client.get(self.url)
+        self.post.text = 'Второй текст'
+        self.post.save()
+        self.assertContains(self.reader_client.get(self.url), 'Второй текст')
+        Comment.objects.create(post=self.post, author=self.reader,
+                               text='Комментарий')
+        self.assertContains(self.reader_client.get(self.url),
+                            'Комментариев: 1')
+        self.group.title = 'Новое название'
+        self.group.save()
+        self.assertContains(self.reader_client.get(self.url),
+                            '#Новое название')
@@ -0,0 +1,116 @@
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import Client, TestCase
+from django.urls import reverse
+
+from posts.models import Post, Group, Comment, Follow
+
+User = get_user_model()
+
+
+class PostListQueriesTest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.reader = User.objects.create_user(username='Reader')
+        cls.group = Group.objects.create(
+            title='TestTitle',
+            slug='test-slug',
+            description='TestDescription'
+        )
+        cls.authors = [
+            User.objects.create_user(username=f'Author{number}')
+            for number in range(3)
+        ]
+        cls.author = cls.authors[0]
+        for author in cls.authors:
+            Follow.objects.create(user=cls.reader, author=author)
+
+    def setUp(self):
+        cache.clear()
+        self.guest_client = Client()
+        self.authorized_client = Client()
+        self.authorized_client.force_login(self.reader)
+
+    def create_posts(self, count):
+        for number in range(count):
+            post = Post.objects.create(
+                text=f'Пост номер {number}',
+                author=self.authors[number % len(self.authors)],
+                group=self.group,
+            )
+            Comment.objects.create(post=post, author=self.reader,
+                                   text='Комментарий')
+
+    def test_feed_pages_run_constant_number_of_queries(self):
+        """
+        Количество запросов на страницах ленты не зависит от числа постов.
+        """
+        # Сессия и пользователь авторизованного клиента берутся из кэша
+        # (после первого запроса); лента подписок читает сначала записи
+        # TimelineEntry, затем посты страницы.
+        self.authorized_client.get(reverse('follow_index'))
+        pages = {
+            reverse('index'): (self.guest_client, 1),
+            reverse('group_posts', kwargs={'slug': 'test-slug'}): (
+                self.guest_client, 2),
+            reverse('profile', kwargs={'username': 'Author0'}): (
+                self.guest_client, 2),
+            reverse('follow_index'): (self.authorized_client, 2),
+        }
+        for posts_count in (2, 10):
+            self.create_posts(posts_count)
+            for url, (client, queries) in pages.items():
+                with self.subTest(url=url, posts_count=posts_count):
+                    with self.assertNumQueries(queries):
+                        response = client.get(url)
+                    self.assertTrue(len(response.context['page']))
+
+    def test_feed_carries_comment_count(self):
+        """Пост в ленте содержит заранее посчитанное число комментариев."""
+        self.create_posts(1)
+        response = self.guest_client.get(reverse('index'))
+        post = response.context['page'][0]
+        self.assertEqual(post.comment_count, 1)
+        self.assertIn('Комментариев: 1', response.content.decode())
+
+
+class PostCommentsQueriesTest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.author = User.objects.create_user(username='Author')
+        cls.post = Post.objects.create(text='Пост', author=cls.author)
+        for number in range(25):
+            commenter = User.objects.create_user(username=f'User{number}')
+            Comment.objects.create(post=cls.post, author=commenter,
+                                   text=f'Комментарий {number}')
+        cls.post_url = reverse('post', kwargs={'username': 'Author',
+                                               'post_id': cls.post.id})
+
+    def setUp(self):
+        self.guest_client = Client()
+
+    def test_post_page_loads_first_comments_with_authors(self):
+        """Пост и первая порция комментариев с авторами — два запроса."""
+        with self.assertNumQueries(2):
+            response = self.guest_client.get(self.post_url)
+        page = response.context['page']
+        self.assertEqual(len(page), 20)
+        self.assertEqual(page[0].text, 'Комментарий 24')
+        self.assertTrue(page.has_next())
+
+    def test_load_more_returns_next_comments_fragment(self):
+        """Фрагмент «показать ещё» отдаёт следующую порцию комментариев."""
+        page = self.guest_client.get(self.post_url).context['page']
+        with self.assertNumQueries(1):
+            response = self.guest_client.get(
+                reverse('post_comments', kwargs={'username': 'Author',
+                                                 'post_id': self.post.id})
+                + '?cursor=' + page.next_cursor)
+        self.assertTemplateUsed(response, 'includes/comment_list.html')
+        self.assertTemplateNotUsed(response, 'base.html')
+        self.assertEqual(
+            [comment.text for comment in response.context['page']],
+            [f'Комментарий {number}' for number in range(4, -1, -1)])
+        self.assertNotContains(response, 'load-more-comments')
@@ -0,0 +1,110 @@
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.apps import apps
+from django.db import connection
+from django.db.models.signals import post_migrate
+from django.test import Client, TestCase
+from django.urls import reverse
+
+from posts import search
+from posts.models import Post
+
+User = get_user_model()
+
+
+class SearchTest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.author = User.objects.create_user(username='Author')
+        cls.admin = User.objects.create_superuser(
+            username='Admin', email='admin@example.com', password='pass')
+
+    def setUp(self):
+        self.guest_client = Client()
+
+    def search(self, query, **params):
+        response = self.guest_client.get(
+            reverse('search'), {'q': query, **params})
+        return response, [post.text for post in response.context['page']]
+
+    def test_search_ranks_matching_posts(self):
+        """Поиск находит посты по словам без учёта регистра и по рангу."""
+        Post.objects.create(text='Кот спит', author=self.author)
+        Post.objects.create(text='Кот и ещё раз кот, КОТ', author=self.author)
+        Post.objects.create(text='Собака гуляет', author=self.author)
+        response, texts = self.search('кот')
+        self.assertTemplateUsed(response, 'search.html')
+        self.assertEqual(texts, ['Кот и ещё раз кот, КОТ', 'Кот спит'])
+        self.assertEqual(self.search('"кот*')[1], texts)
+        self.assertEqual(self.search('')[1], [])
+
+    def test_index_follows_edits_and_deletes(self):
+        """Индекс обновляется при изменении и удалении поста."""
+        post = Post.objects.create(text='Старый текст', author=self.author)
+        post.text = 'Новый текст'
+        post.save()
+        self.assertEqual(self.search('старый')[1], [])
+        self.assertEqual(self.search('новый')[1], ['Новый текст'])
+        post.delete()
+        self.assertEqual(self.search('новый')[1], [])
+
+    def test_rebuild_command_restores_index(self):
+        """Команда rebuild_search_index восстанавливает потерянный индекс."""
+        Post.objects.create(text='Кот спит', author=self.author)
+        with connection.cursor() as cursor:
+            cursor.execute('DROP TRIGGER posts_post_fts_insert')
+            cursor.execute(
+                "INSERT INTO posts_post_fts (posts_post_fts) "
+                "VALUES ('delete-all')")
+        Post.objects.create(text='Кот гуляет', author=self.author)
+        self.assertEqual(self.search('кот')[1], [])
+        call_command('rebuild_search_index', stdout=StringIO())
+        self.assertEqual(len(self.search('кот')[1]), 2)
+        Post.objects.create(text='Кот ест', author=self.author)
+        self.assertEqual(len(self.search('кот')[1]), 3)
+
+    def test_migrate_restores_dropped_triggers(self):
+        """После migrate пропавшие при пересоздании таблицы триггеры
+        возвращаются, а индекс догоняет посты, добавленные без них."""
+        with connection.cursor() as cursor:
+            for trigger in search.TRIGGERS:
+                cursor.execute(f'DROP TRIGGER {trigger}')
+        Post.objects.create(text='Кот спит', author=self.author)
+        self.assertEqual(self.search('кот')[1], [])
+        post_migrate.send(sender=apps.get_app_config('posts'),
+                          app_config=apps.get_app_config('posts'),
+                          verbosity=0, interactive=False,
+                          using=connection.alias, apps=apps, plan=[])
+        self.assertEqual(self.search('кот')[1], ['Кот спит'])
+        post = Post.objects.create(text='Кот гуляет', author=self.author)
+        post.text = 'Кот ест'
+        post.save()
+        self.assertEqual(self.search('ест')[1], ['Кот ест'])
+        self.assertFalse(search.ensure_triggers())
+
+    def test_pages_keep_query(self):
+        """Ссылки на следующую страницу сохраняют поисковый запрос."""
+        for number in range(12):
+            Post.objects.create(text=f'Пост {number}', author=self.author)
+        response, texts = self.search('пост')
+        page = response.context['page']
+        self.assertEqual(len(texts), 10)
+        self.assertContains(response, '&amp;q=%D0%BF%D0%BE%D1%81%D1%82')
+        second = self.search('пост', cursor=page.next_cursor)[1]
+        self.assertEqual(len(second), 2)
+        self.assertFalse(set(texts) & set(second))
+
+    def test_admin_search_uses_index(self):
+        """Поиск в админке возвращает посты из полнотекстового индекса."""
+        Post.objects.create(text='Кот спит', author=self.author)
+        Post.objects.create(text='Собака гуляет', author=self.author)
+        client = Client()
+        client.force_login(self.admin)
+        response = client.get(reverse('admin:posts_post_changelist'),
+                              {'q': 'кот'})
+        self.assertEqual(
+            [post.text for post in response.context['cl'].result_list],
+            ['Кот спит'])
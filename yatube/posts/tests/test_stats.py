@@ -0,0 +1,76 @@
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.test import Client, TestCase
+from django.urls import reverse
+
+from posts.models import Post, Comment, Follow, UserStats
+from posts.subscriptions import unfollow
+
+User = get_user_model()
+
+
+class UserStatsTest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.author = User.objects.create_user(username='Author')
+        cls.reader = User.objects.create_user(username='Reader')
+
+    def stats(self, user):
+        return UserStats.objects.get(user=user)
+
+    def test_counters_follow_posts_and_subscriptions(self):
+        """Счётчики меняются при публикации, подписке и отписке."""
+        post = Post.objects.create(text='Пост', author=self.author)
+        Follow.objects.create(user=self.reader, author=self.author)
+        self.assertEqual(self.stats(self.author).posts_count, 1)
+        self.assertEqual(self.stats(self.author).followers_count, 1)
+        self.assertEqual(self.stats(self.reader).following_count, 1)
+        post.delete()
+        unfollow(self.reader, self.author)
+        self.assertEqual(self.stats(self.author).posts_count, 0)
+        self.assertEqual(self.stats(self.author).followers_count, 0)
+        self.assertEqual(self.stats(self.reader).following_count, 0)
+
+    def test_author_card_reads_stats(self):
+        """Карточка автора показывает денормализованные счётчики."""
+        Post.objects.create(text='Пост', author=self.author)
+        Follow.objects.create(user=self.reader, author=self.author)
+        response = Client().get(
+            reverse('profile', kwargs={'username': 'Author'}))
+        content = response.content.decode()
+        self.assertIn('Подписчиков: 1', content)
+        self.assertIn('Постов: 1', content)
+
+    def test_delete_user_with_posts_comments_and_follows(self):
+        """Удаление пользователя не создаёт счётчики удаляемому автору."""
+        user = User.objects.create_user(username='Leaving')
+        post = Post.objects.create(text='Пост', author=user)
+        Comment.objects.create(post=post, author=self.reader, text='Отзыв')
+        Follow.objects.create(user=user, author=self.author)
+        Follow.objects.create(user=self.reader, author=user)
+        user.delete()
+        self.assertFalse(UserStats.objects.filter(user_id=user.pk).exists())
+        self.assertFalse(Post.objects.filter(pk=post.pk).exists())
+        self.assertEqual(self.stats(self.author).followers_count, 0)
+        self.assertEqual(self.stats(self.reader).following_count, 0)
+
+    def test_queryset_delete_updates_counters(self):
+        """Удаление подписок мимо unfollow() тоже сдвигает счётчики."""
+        Follow.objects.create(user=self.reader, author=self.author)
+        Follow.objects.filter(user=self.reader).delete()
+        self.assertEqual(self.stats(self.author).followers_count, 0)
+        self.assertEqual(self.stats(self.reader).following_count, 0)
+
+    def test_reconcile_repairs_drift(self):
+        """Команда reconcile_user_stats исправляет рассинхронизацию."""
+        Post.objects.create(text='Пост', author=self.author)
+        UserStats.objects.filter(user=self.author).update(posts_count=42)
+        UserStats.objects.filter(user=self.reader).delete()
+        out = StringIO()
+        call_command('reconcile_user_stats', stdout=out)
+        self.assertIn('2', out.getvalue())
+        self.assertEqual(self.stats(self.author).posts_count, 1)
+        self.assertTrue(UserStats.objects.filter(user=self.reader).exists())
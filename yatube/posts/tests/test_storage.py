@@ -0,0 +1,63 @@
+import io
+import os
+import shutil
+import tempfile
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.files.base import ContentFile
+from django.core.files.storage import FileSystemStorage
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+
+from posts.models import Post
+from posts.storage import content_hash, hashed_name
+
+User = get_user_model()
+
+MEDIA_ROOT = tempfile.mkdtemp(dir=settings.BASE_DIR)
+
+
+@override_settings(MEDIA_ROOT=MEDIA_ROOT)
+class ContentAddressedStorageTest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='TestUser')
+        cls.storage = Post._meta.get_field('image').storage
+
+    @classmethod
+    def tearDownClass(cls):
+        shutil.rmtree(MEDIA_ROOT, ignore_errors=True)
+        super().tearDownClass()
+
+    def test_same_content_is_stored_once(self):
+        """Одинаковое содержимое сохраняется в один файл по хэшу."""
+        first = self.storage.save('posts/a.png', ContentFile(b'picture'))
+        second = self.storage.save('posts/b.png', ContentFile(b'picture'))
+        digest = content_hash(ContentFile(b'picture'))
+        self.assertEqual(first, second)
+        self.assertEqual(
+            first, f'posts/{digest[:2]}/{digest[2:4]}/{digest}.png')
+        self.assertEqual(
+            os.listdir(os.path.join(MEDIA_ROOT, 'posts', digest[:2],
+                                    digest[2:4])),
+            [f'{digest}.png'])
+
+    def test_dedupe_images_repoints_posts(self):
+        """Команда dedupe_images схлопывает копии и переводит посты."""
+        plain = FileSystemStorage()
+        names = [plain.save('posts/image2.png', ContentFile(b'same'))
+                 for _ in range(2)]
+        self.assertNotEqual(*names)
+        posts = [Post.objects.create(text='Копия', author=self.user,
+                                     image=name) for name in names]
+        call_command('dedupe_images', stdout=io.StringIO())
+        target = hashed_name('posts/image2.png',
+                             content_hash(ContentFile(b'same')))
+        for post in posts:
+            post.refresh_from_db()
+            self.assertEqual(post.image.name, target)
+        self.assertTrue(self.storage.exists(target))
+        for name in names:
+            self.assertFalse(self.storage.exists(name))
@@ -0,0 +1,74 @@
+import shutil
+import tempfile
+from unittest import mock
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import Client, TestCase, override_settings
+from django.urls import reverse
+
+from posts import thumbnails
+from posts.models import Post
+
+User = get_user_model()
+
+MEDIA_ROOT = tempfile.mkdtemp(dir=settings.BASE_DIR)
+
+
+@override_settings(MEDIA_ROOT=MEDIA_ROOT)
+class ThumbnailTest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='TestUser')
+        small_gif = (
+            b'\x47\x49\x46\x38\x39\x61\x02\x00'
+            b'\x01\x00\x80\x00\x00\x00\x00\x00'
+            b'\xFF\xFF\xFF\x21\xF9\x04\x00\x00'
+            b'\x00\x00\x00\x2C\x00\x00\x00\x00'
+            b'\x02\x00\x01\x00\x00\x02\x02\x0C'
+            b'\x0A\x00\x3B'
+        )
+        cls.post = Post.objects.create(
+            text='Пост с картинкой',
+            author=cls.user,
+            image=SimpleUploadedFile('small.gif', small_gif, 'image/gif'),
+        )
+
+    @classmethod
+    def tearDownClass(cls):
+        shutil.rmtree(MEDIA_ROOT, ignore_errors=True)
+        super().tearDownClass()
+
+    def setUp(self):
+        cache.clear()
+
+    def test_placeholder_until_thumbnail_is_ready(self):
+        """Пока миниатюры нет, страница не ждёт её и рисует заглушку."""
+        response = Client().get(reverse('index'))
+        self.assertContains(response, 'padding-top: 35.3%')
+        self.assertNotContains(response, '<img class="card-img"')
+
+    def test_ready_thumbnail_is_rendered(self):
+        """Готовые миниатюры выводятся вместо заглушки с srcset."""
+        thumbnails.generate(self.post.image.name)
+        sources = thumbnails.ready(self.post.image.name)
+        response = Client().get(reverse('index'))
+        self.assertContains(
+            response, f'<img class="card-img" src="{sources["src"]}"')
+        self.assertContains(response, f'srcset="{sources["webp"]}"')
+        self.assertContains(response, f'srcset="{sources["jpeg"]}"')
+        self.assertEqual(sources['webp'].count('.webp'),
+                         len(thumbnails.THUMBNAIL_WIDTHS))
+
+    def test_schedule_reads_worker_setting(self):
+        """Без потоков генерации задача после коммита не ставится."""
+        with mock.patch('posts.thumbnails.transaction.on_commit') as on_commit:
+            with override_settings(THUMBNAIL_WORKERS=0):
+                thumbnails.schedule('posts/first.gif')
+            on_commit.assert_not_called()
+            with override_settings(THUMBNAIL_WORKERS=1):
+                thumbnails.schedule('posts/second.gif')
+            on_commit.assert_called_once()
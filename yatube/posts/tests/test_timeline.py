@@ -0,0 +1,73 @@
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+
+from posts import timeline
+from posts.models import Post, Follow, TimelineEntry
+from posts.subscriptions import unfollow
+
+User = get_user_model()
+
+
+class TimelineTest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.reader = User.objects.create_user(username='Reader')
+        cls.author = User.objects.create_user(username='Author')
+        cls.other_author = User.objects.create_user(username='OtherAuthor')
+        cls.old_post = Post.objects.create(text='Старый пост',
+                                           author=cls.author)
+        Post.objects.create(text='Чужой пост', author=cls.other_author)
+
+    def timeline_posts(self):
+        return list(TimelineEntry.objects.filter(
+            user=self.reader).values_list('post__text', flat=True))
+
+    def test_follow_backfills_and_new_posts_fan_out(self):
+        """Подписка добавляет старые посты, новые попадают в ленту сразу."""
+        Follow.objects.create(user=self.reader, author=self.author)
+        self.assertEqual(self.timeline_posts(), ['Старый пост'])
+        Post.objects.create(text='Новый пост', author=self.author)
+        self.assertEqual(self.timeline_posts(),
+                         ['Новый пост', 'Старый пост'])
+
+    def test_fan_out_is_one_insert_select(self):
+        """Рассылка поста — один INSERT ... SELECT с датой поста."""
+        Follow.objects.create(user=self.reader, author=self.author)
+        post = Post.objects.create(text='Новый пост', author=self.author)
+        TimelineEntry.objects.filter(post=post).delete()
+        with CaptureQueriesContext(connection) as queries:
+            timeline.fan_out(post)
+        self.assertEqual(len(queries), 1)
+        self.assertTrue(queries[0]['sql'].startswith('INSERT'))
+        entry = TimelineEntry.objects.get(post=post)
+        self.assertEqual((entry.user, entry.pub_date),
+                         (self.reader, post.pub_date))
+
+    def test_unfollow_prunes_timeline(self):
+        """После отписки посты автора исчезают из ленты."""
+        Follow.objects.create(user=self.reader, author=self.author)
+        Follow.objects.create(user=self.reader, author=self.other_author)
+        unfollow(self.reader, self.author)
+        self.assertEqual(self.timeline_posts(), ['Чужой пост'])
+
+    def test_deleted_author_leaves_timeline(self):
+        """Каскадное удаление подписки вместе с автором чистит ленту."""
+        author = User.objects.create_user(username='Leaving')
+        Post.objects.create(text='Пост уходящего автора', author=author)
+        Follow.objects.create(user=self.reader, author=author)
+        Follow.objects.create(user=self.reader, author=self.other_author)
+        author.delete()
+        self.assertEqual(self.timeline_posts(), ['Чужой пост'])
+
+    def test_rebuild_timelines_command(self):
+        """Команда rebuild_timelines восстанавливает ленты по подпискам."""
+        Follow.objects.create(user=self.reader, author=self.author)
+        TimelineEntry.objects.all().delete()
+        call_command('rebuild_timelines', stdout=StringIO())
+        self.assertEqual(self.timeline_posts(), ['Старый пост'])
@@ -4,7 +4,9 @@ import os
 from django.conf import settings
 from django.core.files.uploadedfile import SimpleUploadedFile
 from django.contrib.auth import get_user_model
+from django.db import IntegrityError, connection, transaction
 from django.test import Client, TestCase
+from django.test.utils import CaptureQueriesContext
 from django.urls import reverse
 from django import forms
 
@@ -224,3 +226,42 @@ class PostViewTests(TestCase):
         self.assertEqual(comment_count + 1, Comment.objects.count())
         self.assertTrue(Comment.objects.filter(text='TestText').exists())
         self.assertRedirects(auth_response, '/TestUser/1/')
+
+
+class FollowTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.author = User.objects.create_user(username='Author')
+        cls.reader = User.objects.create_user(username='Reader')
+
+    def setUp(self):
+        self.client = Client()
+        self.client.force_login(self.reader)
+
+    def test_follow_is_unique(self):
+        """База не даёт создать повторную подписку."""
+        Follow.objects.create(user=self.reader, author=self.author)
+        with self.assertRaises(IntegrityError), transaction.atomic():
+            Follow.objects.create(user=self.reader, author=self.author)
+
+    def test_double_follow_creates_one_subscription(self):
+        """Повторный запрос подписки не создаёт дубликат."""
+        url = reverse('profile_follow', kwargs={'username': 'Author'})
+        self.client.get(url)
+        response = self.client.get(url)
+        self.assertRedirects(response, reverse(
+            'profile', kwargs={'username': 'Author'}))
+        self.assertEqual(Follow.objects.filter(user=self.reader).count(), 1)
+
+    def test_unfollow_deletes_in_one_statement(self):
+        """Отписка удаляет подписку одним DELETE, без проверки exists()."""
+        Follow.objects.create(user=self.reader, author=self.author)
+        with CaptureQueriesContext(connection) as queries:
+            self.client.get(reverse('profile_unfollow',
+                                    kwargs={'username': 'Author'}))
+        follow_queries = [query['sql'] for query in queries
+                          if 'posts_follow' in query['sql']]
+        self.assertEqual(len(follow_queries), 1)
+        self.assertTrue(follow_queries[0].startswith('DELETE'))
+        self.assertFalse(Follow.objects.exists())
@@ -0,0 +1,110 @@
+import hashlib
+import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import close_old_connections, transaction
+from sorl.thumbnail import get_thumbnail
+
+from .cache import bump_feed_version
+
+logger = logging.getLogger(__name__)
+
+# Ширины миниатюр для srcset карточки includes/post_card.html: высота
+# держит пропорцию карточки 960x339. WebP отдаём браузерам, которые его
+# понимают, JPEG — остальным; src без srcset получает DEFAULT_WIDTH.
+THUMBNAIL_WIDTHS = (480, 960, 1440)
+THUMBNAIL_RATIO = 339 / 960
+THUMBNAIL_FORMATS = ('WEBP', 'JPEG')
+THUMBNAIL_OPTIONS = {'crop': 'center', 'upscale': True, 'quality': 80}
+DEFAULT_WIDTH = 960
+
+# Пул создаётся при первой задаче, а не при импорте: так его размер
+# (и отключение через THUMBNAIL_WORKERS = 0) можно переопределить.
+_executor = None
+_executor_lock = threading.Lock()
+# Картинки, уже поставленные в очередь этим процессом. Запись живёт
+# ограниченное время: если транзакция откатилась и задача не ушла
+# в пул, картинку можно будет поставить в очередь повторно.
+PENDING_TIMEOUT = 60
+_pending = {}
+_pending_lock = threading.Lock()
+
+
+def _key(name):
+    digest = hashlib.md5(name.encode()).hexdigest()
+    return f'posts:thumbnails:{digest}'
+
+
+def geometry(width):
+    return f'{width}x{round(width * THUMBNAIL_RATIO)}'
+
+
+def ready(name):
+    """
+    Готовые миниатюры картинки: {'webp': srcset, 'jpeg': srcset,
+    'src': url} или None, если они ещё не сгенерированы.
+    """
+    return cache.get(_key(name))
+
+
+def generate(name):
+    sources = {}
+    for image_format in THUMBNAIL_FORMATS:
+        srcset = []
+        for width in THUMBNAIL_WIDTHS:
+            thumbnail = get_thumbnail(name, geometry(width),
+                                      format=image_format,
+                                      **THUMBNAIL_OPTIONS)
+            srcset.append(f'{thumbnail.url} {width}w')
+            if image_format == 'JPEG' and width == DEFAULT_WIDTH:
+                sources['src'] = thumbnail.url
+        sources[image_format.lower()] = ', '.join(srcset)
+    # Ключ один на картинку: шаблон видит либо все размеры, либо ничего.
+    cache.set(_key(name), sources, timeout=None)
+    # Страницы с заглушкой вместо картинки устарели.
+    bump_feed_version()
+
+
+def _generate_in_background(name):
+    close_old_connections()
+    try:
+        generate(name)
+    except Exception:
+        logger.exception('Не удалось сгенерировать миниатюры для %s', name)
+    finally:
+        with _pending_lock:
+            _pending.pop(name, None)
+        close_old_connections()
+
+
+def _get_executor():
+    global _executor
+    if not settings.THUMBNAIL_WORKERS:
+        return None
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(
+                max_workers=settings.THUMBNAIL_WORKERS,
+                thread_name_prefix='thumbnails')
+    return _executor
+
+
+def schedule(name):
+    """
+    Ставит генерацию миниатюр в фоновый поток после коммита транзакции,
+    чтобы ни один запрос не ждал декодирования и ресайза картинки.
+    """
+    executor = _get_executor()
+    if executor is None:
+        return
+    now = time.monotonic()
+    with _pending_lock:
+        if now - _pending.get(name, -PENDING_TIMEOUT) < PENDING_TIMEOUT:
+            return
+        _pending[name] = now
+    transaction.on_commit(
+        lambda: executor.submit(_generate_in_background, name))
@@ -0,0 +1,61 @@
+from django.db import connection
+
+from .models import Post, Follow, TimelineEntry
+from .paginator import paginate
+
+
+def _insert_select(select, params):
+    """
+    Заполняет ленты одним INSERT ... SELECT: строки копируются внутри
+    базы, без загрузки постов в Python. Уже существующие пропускаются.
+    """
+    ops = connection.ops
+    table = ops.quote_name(TimelineEntry._meta.db_table)
+    sql = (f'{ops.insert_statement(ignore_conflicts=True)} {table} '
+           f'(user_id, post_id, author_id, pub_date) {select} '
+           f'{ops.ignore_conflicts_suffix_sql(ignore_conflicts=True)}')
+    with connection.cursor() as cursor:
+        cursor.execute(sql, params)
+
+
+def fan_out(post):
+    """Добавляет новый пост в ленты всех подписчиков автора."""
+    follows = connection.ops.quote_name(Follow._meta.db_table)
+    pub_date = connection.ops.adapt_datetimefield_value(post.pub_date)
+    _insert_select(f'SELECT user_id, %s, %s, %s FROM {follows} '
+                   f'WHERE author_id = %s',
+                   [post.pk, post.author_id, pub_date, post.author_id])
+
+
+def backfill(user_id, author_id):
+    """Добавляет в ленту подписчика все посты автора."""
+    posts = connection.ops.quote_name(Post._meta.db_table)
+    _insert_select(f'SELECT %s, id, author_id, pub_date FROM {posts} '
+                   f'WHERE author_id = %s', [user_id, author_id])
+
+
+def prune(user_id, author_id):
+    TimelineEntry.objects.filter(user_id=user_id,
+                                 author_id=author_id).delete()
+
+
+def rebuild():
+    TimelineEntry.objects.all().delete()
+    posts = connection.ops.quote_name(Post._meta.db_table)
+    follows = connection.ops.quote_name(Follow._meta.db_table)
+    _insert_select(f'SELECT f.user_id, p.id, p.author_id, p.pub_date '
+                   f'FROM {follows} f JOIN {posts} p '
+                   f'ON p.author_id = f.author_id', [])
+
+
+def timeline_page(request):
+    """
+    Страница ленты подписок: диапазон по индексу (user, pub_date)
+    в одной таблице, затем посты страницы одним запросом по ключам.
+    """
+    page = paginate(request, TimelineEntry.objects.filter(user=request.user))
+    posts = Post.objects.with_related().in_bulk(
+        [entry.post_id for entry in page.object_list])
+    page.object_list = [posts[entry.post_id] for entry in page.object_list
+                        if entry.post_id in posts]
+    return page
@@ -1,24 +1,34 @@
 from django.urls import path
 
+from monitoring.queries import query_budget
+
 from . import views
 
+# Число запросов каждого view с учётом сессии и пользователя.
+# Превышение бюджета — почти всегда N+1 или потерянный select_related.
 urlpatterns = [
-    path("", views.index, name="index"),
-    path("group/<slug:slug>/", views.group_posts, name="group_posts"),
-    path("new/", views.new_post, name="new_post"),
-    path("follow/", views.follow_index, name="follow_index"),
-    path("<str:username>/", views.profile, name='profile'),
-    path("<str:username>/<int:post_id>/", views.post_view, name='post'),
+    path("", query_budget(3)(views.index), name="index"),
+    path("group/<slug:slug>/", query_budget(4)(views.group_posts),
+         name="group_posts"),
+    path("new/", query_budget(11)(views.new_post), name="new_post"),
+    path("follow/", query_budget(4)(views.follow_index),
+         name="follow_index"),
+    path("search/", query_budget(4)(views.search), name="search"),
+    path("<str:username>/", query_budget(7)(views.profile), name='profile'),
+    path("<str:username>/<int:post_id>/", query_budget(4)(views.post_view),
+         name='post'),
     path(
         "<str:username>/<int:post_id>/edit/",
-        views.post_edit,
+        query_budget(8)(views.post_edit),
         name='post_edit'),
     path("<username>/<int:post_id>/comment",
-         views.add_comment, name="add_comment"),
+         query_budget(4)(views.add_comment), name="add_comment"),
+    path("<str:username>/<int:post_id>/comments/",
+         query_budget(3)(views.post_comments), name="post_comments"),
     path("<str:username>/follow/",
-         views.profile_follow, name="profile_follow"),
+         query_budget(8)(views.profile_follow), name="profile_follow"),
     path("<str:username>/unfollow/",
-         views.profile_unfollow, name="profile_unfollow"),
+         query_budget(10)(views.profile_unfollow), name="profile_unfollow"),
     path('404/', views.page_not_found, name='404'),
     path('500/', views.server_error, name='500'),
 ]
@@ -1,29 +1,45 @@
 from django.shortcuts import render, redirect, get_object_or_404
 from django.contrib.auth.decorators import login_required
 from django.contrib.auth.models import User
-from django.core.paginator import Paginator
+from .cache import cached_feed_page
+from .conditional import conditional_page
+from .db import retry_on_locked
 from .forms import PostForm, CommentForm
-from .models import Post, Group, Comment, Follow
+from .models import Post, Group, Comment
+from .page_cache import cached_page
+from .paginator import COMMENTS_PER_PAGE, paginate
+from .search import search_page
+from .stats import get_stats
+from .subscriptions import follow, unfollow
+from .timeline import timeline_page
 
 
+@conditional_page
+@cached_page
 def index(request):
-    posts = Post.objects.all()
-    paginator = Paginator(posts, 10)
-    page_number = request.GET.get('page')
-    page = paginator.get_page(page_number)
+    page = cached_feed_page(
+        'index', request.GET.get('cursor'),
+        lambda: paginate(request, Post.objects.with_related()))
     return render(request, 'index.html', {'page': page})
 
 
+@conditional_page
+@cached_page
 def group_posts(request, slug):
     group = get_object_or_404(Group, slug=slug)
-    posts = group.posts.all()
-    paginator = Paginator(posts, 10)
-    page_number = request.GET.get('page')
-    page = paginator.get_page(page_number)
+    posts = group.posts.with_related()
+    page = paginate(request, posts)
     return render(request, "group.html", {"group": group, "page": page})
 
 
+def search(request):
+    query = request.GET.get('q', '').strip()
+    page = search_page(request, query)
+    return render(request, 'search.html', {'page': page, 'query': query})
+
+
 @login_required
+@retry_on_locked
 def new_post(request):
     form = PostForm(request.POST or None, files=request.FILES or None)
     if form.is_valid():
@@ -34,34 +50,50 @@ def new_post(request):
     return render(request, 'new.html', {'form': form, 'is_edit': False})
 
 
+@conditional_page
+@cached_page
 def profile(request, username):
-    author_profile = get_object_or_404(User, username=username)
-    post = author_profile.posts.all()
-    paginator = Paginator(post, 10)
-    page_number = request.GET.get('page')
-    page = paginator.get_page(page_number)
-    subscription = False
-    if request.user.is_authenticated:
-        subscription = Follow.objects.filter(user=request.user,
-                                             author=author_profile).exists()
+    author_profile = get_object_or_404(User.objects.select_related('stats'),
+                                       username=username)
+    get_stats(author_profile)
+    post = author_profile.posts.with_related()
+    page = paginate(request, post)
+    # Кнопку подписки рисует фрагмент follow_button для каждого читателя.
     return render(request, 'profile.html', {
         'page': page,
         'profile': author_profile,
-        'subscription': subscription,
     })
 
 
+@conditional_page
 def post_view(request, username, post_id):
-    post = get_object_or_404(Post, author__username=username, id=post_id)
+    post = get_object_or_404(Post.objects.with_related(),
+                             author__username=username, id=post_id)
     form = CommentForm()
-    comments = Comment.objects.filter(post__id=post_id)
+    comments = post.comments.select_related('author')
+    page = paginate(request, comments, COMMENTS_PER_PAGE, field='created')
     return render(request, 'post.html', {'post': post,
                                          'form': form,
                                          'comments': comments,
+                                         'page': page,
                                          'profile': post.author})
 
 
+def post_comments(request, username, post_id):
+    comments = Comment.objects.filter(
+        post_id=post_id,
+        post__author__username=username,
+    ).select_related('author')
+    page = paginate(request, comments, COMMENTS_PER_PAGE, field='created')
+    return render(request, 'includes/comment_list.html', {
+        'page': page,
+        'username': username,
+        'post_id': post_id,
+    })
+
+
 @login_required
+@retry_on_locked
 def add_comment(request, username, post_id):
     post = get_object_or_404(Post, author__username=username, id=post_id)
     form = CommentForm(request.POST or None)
@@ -74,6 +106,7 @@ def add_comment(request, username, post_id):
 
 
 @login_required
+@retry_on_locked
 def post_edit(request, username, post_id):
     post = get_object_or_404(Post,
                              author__username=username,
@@ -97,30 +130,24 @@ def post_edit(request, username, post_id):
 
 @login_required
 def follow_index(request):
-    posts = Post.objects.filter(author__following__user=request.user)
-    paginator = Paginator(posts, 10)
-    page_number = request.GET.get('page')
-    page = paginator.get_page(page_number)
+    page = timeline_page(request)
     return render(request, "follow.html", {'page': page})
 
 
 @login_required
+@retry_on_locked
 def profile_follow(request, username):
     author = get_object_or_404(User, username=username)
-    if (request.user != author and not
-            Follow.objects.filter(user=request.user,
-                                  author=author).exists()):
-        Follow.objects.create(user=request.user, author=author)
+    if request.user != author and follow(request.user, author):
         return redirect('follow_index')
     return redirect('profile', username=username)
 
 
 @login_required
+@retry_on_locked
 def profile_unfollow(request, username):
-    subscribe = Follow.objects.filter(user=request.user,
-                                      author__username=username)
-    if subscribe.exists():
-        subscribe.delete()
+    author = get_object_or_404(User, username=username)
+    if unfollow(request.user, author):
         return redirect('follow_index')
     return redirect('profile', username=username)
 
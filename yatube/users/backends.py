@@ -0,0 +1,26 @@
+from django.conf import settings
+from django.contrib.auth.backends import ModelBackend
+from django.core.cache import cache
+
+
+def user_key(pk):
+    return f'users:user:{pk}'
+
+
+class CachedModelBackend(ModelBackend):
+    """
+    ModelBackend, который берёт пользователя сессии из кэша, а не из
+    auth_user на каждый запрос. Запись в кэше удаляется при любом
+    сохранении пользователя (вход, смена пароля, правка в админке),
+    так что хэш сессии всегда сверяется с актуальным паролем.
+    """
+
+    def get_user(self, user_id):
+        key = user_key(user_id)
+        user = cache.get(key)
+        if user is None:
+            user = super().get_user(user_id)
+            if user is None:
+                return None
+            cache.set(key, user, settings.USER_CACHE_TIMEOUT)
+        return user if self.user_can_authenticate(user) else None
@@ -0,0 +1,19 @@
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from .backends import user_key
+
+User = get_user_model()
+
+
+@receiver(post_save, sender=User)
+@receiver(post_delete, sender=User)
+def invalidate_cached_user(instance, **kwargs):
+    key = user_key(instance.pk)
+    cache.delete(key)
+    # Пока транзакция не закоммичена, параллельный запрос может снова
+    # положить в кэш старую строку — удаляем ещё раз после коммита.
+    transaction.on_commit(lambda: cache.delete(key))
@@ -0,0 +1,44 @@
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import Client, TestCase
+from django.urls import reverse
+
+User = get_user_model()
+
+
+class CachedSessionUserTest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='Reader',
+                                            password='old-secret-42')
+
+    def setUp(self):
+        cache.clear()
+        self.client = Client()
+        self.client.login(username='Reader', password='old-secret-42')
+
+    def test_session_and_user_come_from_cache(self):
+        """Повторный запрос не читает ни django_session, ни auth_user."""
+        url = reverse('about:author')
+        self.client.get(url)
+        with self.assertNumQueries(0):
+            response = self.client.get(url)
+        self.assertEqual(response.wsgi_request.user, self.user)
+
+    def test_password_change_logs_out_other_sessions(self):
+        """Смена пароля сбрасывает пользователя в кэше и чужие сессии."""
+        url = reverse('about:author')
+        self.client.get(url)
+        self.user.set_password('new-secret-42')
+        self.user.save()
+        response = self.client.get(url)
+        self.assertFalse(response.wsgi_request.user.is_authenticated)
+
+    def test_logout_drops_cached_session(self):
+        """После выхода сессия из кэша не восстанавливает пользователя."""
+        url = reverse('about:author')
+        self.client.get(url)
+        self.client.get(reverse('logout'))
+        response = self.client.get(url)
+        self.assertFalse(response.wsgi_request.user.is_authenticated)
@@ -0,0 +1,234 @@
+import os
+import pickle
+import sqlite3
+import threading
+import time
+
+from django.core.cache.backends.base import DEFAULT_TIMEOUT, BaseCache
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS cache (
+    key TEXT PRIMARY KEY,
+    value BLOB NOT NULL,
+    expires REAL,
+    accessed REAL NOT NULL
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS cache_accessed ON cache (accessed);
+"""
+
+
+class SQLiteCache(BaseCache):
+    """
+    Кэш в файле SQLite в режиме WAL, общий для всех процессов хоста.
+
+    Читатели не блокируют писателей, incr атомарен между процессами,
+    а при превышении MAX_ENTRIES вытесняются давно не читавшиеся ключи
+    (приближённый LRU: время доступа обновляется не чаще TOUCH_INTERVAL
+    секунд, чтобы чтение не превращалось в запись).
+
+    Целые числа хранятся как INTEGER, остальное — как pickle.
+    """
+
+    def __init__(self, location, params):
+        super().__init__(params)
+        options = params.get('OPTIONS', {})
+        self._path = location
+        self._busy_timeout = options.get('BUSY_TIMEOUT', 5)
+        self._touch_interval = options.get('TOUCH_INTERVAL', 60)
+        self._cull_check_interval = options.get('CULL_CHECK_INTERVAL', 100)
+        self._local = threading.local()
+        self._writes = 0
+        self._writes_lock = threading.Lock()
+
+    def _connection(self):
+        # Соединение своё у каждого потока и у каждого процесса после fork.
+        local = self._local
+        if getattr(local, 'pid', None) != os.getpid():
+            self._create_file()
+            connection = sqlite3.connect(self._path,
+                                         timeout=self._busy_timeout,
+                                         isolation_level=None,
+                                         check_same_thread=False)
+            connection.execute('PRAGMA journal_mode=WAL')
+            connection.execute('PRAGMA synchronous=NORMAL')
+            connection.executescript(SCHEMA)
+            local.connection = connection
+            local.pid = os.getpid()
+        return local.connection
+
+    def _create_file(self):
+        # В кэше лежат сессии и пользователи с хэшами паролей: файл
+        # доступен только владельцу (журналы WAL SQLite создаёт с теми
+        # же правами).
+        directory = os.path.dirname(self._path)
+        if directory:
+            os.makedirs(directory, 0o700, exist_ok=True)
+        os.close(os.open(self._path, os.O_CREAT | os.O_RDWR, 0o600))
+
+    def _key(self, key, version):
+        key = self.make_key(key, version=version)
+        self.validate_key(key)
+        return key
+
+    @staticmethod
+    def _encode(value):
+        if type(value) is int:
+            return value
+        return sqlite3.Binary(pickle.dumps(value, pickle.HIGHEST_PROTOCOL))
+
+    @staticmethod
+    def _decode(value):
+        if isinstance(value, int):
+            return value
+        return pickle.loads(value)
+
+    def get(self, key, default=None, version=None):
+        return self.get_many([key], version=version).get(key, default)
+
+    def get_many(self, keys, version=None):
+        if not keys:
+            return {}
+        made_keys = {self._key(key, version): key for key in keys}
+        now = time.time()
+        connection = self._connection()
+        rows = connection.execute(
+            'SELECT key, value, accessed FROM cache WHERE key IN (%s) '
+            'AND (expires IS NULL OR expires > ?)'
+            % ', '.join('?' * len(made_keys)),
+            [*made_keys, now],
+        ).fetchall()
+        stale = [row[0] for row in rows
+                 if now - row[2] > self._touch_interval]
+        if stale:
+            connection.execute(
+                'UPDATE cache SET accessed = ? WHERE key IN (%s)'
+                % ', '.join('?' * len(stale)),
+                [now, *stale],
+            )
+        return {made_keys[key]: self._decode(value)
+                for key, value, _ in rows}
+
+    def set(self, key, value, timeout=DEFAULT_TIMEOUT, version=None):
+        self.set_many({key: value}, timeout=timeout, version=version)
+
+    def set_many(self, data, timeout=DEFAULT_TIMEOUT, version=None):
+        expires = self.get_backend_timeout(timeout)
+        now = time.time()
+        rows = [(self._key(key, version), self._encode(value), expires, now)
+                for key, value in data.items()]
+        connection = self._connection()
+        with connection:
+            connection.execute('BEGIN IMMEDIATE')
+            connection.executemany(
+                'INSERT OR REPLACE INTO cache (key, value, expires, accessed)'
+                ' VALUES (?, ?, ?, ?)', rows)
+        self._maybe_cull(len(rows))
+        return []
+
+    def add(self, key, value, timeout=DEFAULT_TIMEOUT, version=None):
+        key = self._key(key, version)
+        now = time.time()
+        connection = self._connection()
+        # Перезаписываем только просроченную запись: одна атомарная
+        # операция вместо проверки и вставки.
+        cursor = connection.execute(
+            'INSERT INTO cache (key, value, expires, accessed) '
+            'VALUES (?, ?, ?, ?) '
+            'ON CONFLICT (key) DO UPDATE SET value = excluded.value, '
+            'expires = excluded.expires, accessed = excluded.accessed '
+            'WHERE cache.expires IS NOT NULL AND cache.expires <= ?',
+            (key, self._encode(value), self.get_backend_timeout(timeout),
+             now, now),
+        )
+        self._maybe_cull(1)
+        return cursor.rowcount > 0
+
+    def incr(self, key, delta=1, version=None):
+        made_key = self._key(key, version)
+        connection = self._connection()
+        with connection:
+            connection.execute('BEGIN IMMEDIATE')
+            cursor = connection.execute(
+                "UPDATE cache SET value = value + ? WHERE key = ? "
+                "AND typeof(value) = 'integer' "
+                "AND (expires IS NULL OR expires > ?)",
+                (delta, made_key, time.time()),
+            )
+            if cursor.rowcount:
+                return connection.execute(
+                    'SELECT value FROM cache WHERE key = ?', (made_key,)
+                ).fetchone()[0]
+        value = self.get(key, version=version)
+        if value is None:
+            raise ValueError("Key '%s' not found" % key)
+        # Значение есть, но не целое: ведём себя как остальные бэкенды.
+        return super().incr(key, delta, version)
+
+    def touch(self, key, timeout=DEFAULT_TIMEOUT, version=None):
+        key = self._key(key, version)
+        cursor = self._connection().execute(
+            'UPDATE cache SET expires = ? WHERE key = ? '
+            'AND (expires IS NULL OR expires > ?)',
+            (self.get_backend_timeout(timeout), key, time.time()),
+        )
+        return cursor.rowcount > 0
+
+    def has_key(self, key, version=None):
+        key = self._key(key, version)
+        row = self._connection().execute(
+            'SELECT 1 FROM cache WHERE key = ? '
+            'AND (expires IS NULL OR expires > ?)',
+            (key, time.time()),
+        ).fetchone()
+        return row is not None
+
+    def delete(self, key, version=None):
+        self.delete_many([key], version=version)
+
+    def delete_many(self, keys, version=None):
+        keys = [self._key(key, version) for key in keys]
+        if keys:
+            self._connection().execute(
+                'DELETE FROM cache WHERE key IN (%s)'
+                % ', '.join('?' * len(keys)), keys)
+
+    def clear(self):
+        self._connection().execute('DELETE FROM cache')
+
+    def close(self, **kwargs):
+        # Соединение живёт весь поток: переоткрывать файл на каждый
+        # запрос дороже, чем держать его открытым.
+        pass
+
+    def _maybe_cull(self, written):
+        # COUNT(*) проходит по индексу целиком, поэтому размер
+        # проверяем не на каждой записи, а раз в CULL_CHECK_INTERVAL.
+        with self._writes_lock:
+            self._writes += written
+            if self._writes < self._cull_check_interval:
+                return
+            self._writes = 0
+        self._cull()
+
+    def _cull(self):
+        connection = self._connection()
+        with connection:
+            connection.execute('BEGIN IMMEDIATE')
+            connection.execute(
+                'DELETE FROM cache WHERE expires IS NOT NULL '
+                'AND expires <= ?', (time.time(),))
+            count = connection.execute(
+                'SELECT COUNT(*) FROM cache').fetchone()[0]
+            if count <= self._max_entries:
+                return
+            if self._cull_frequency == 0:
+                connection.execute('DELETE FROM cache')
+                return
+            # Вытесняем давно не читавшиеся ключи, пока не уложимся
+            # в лимит с запасом в 1 / CULL_FREQUENCY.
+            excess = count - self._max_entries
+            evict = max(excess, count // self._cull_frequency)
+            connection.execute(
+                'DELETE FROM cache WHERE key IN ('
+                'SELECT key FROM cache ORDER BY accessed LIMIT ?)',
+                (evict,))
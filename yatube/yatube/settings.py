@@ -40,6 +40,8 @@ INSTALLED_APPS = [
     'posts',
     'users',
     'about',
+    'api',
+    'monitoring',
     'django.contrib.admin',
     'django.contrib.auth',
     'django.contrib.contenttypes',
@@ -51,6 +53,10 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    # Статика отдаётся раньше замеров и остальных middleware.
+    'yatube.staticfiles.StaticFilesMiddleware',
+    'monitoring.middleware.MetricsMiddleware',
+    'monitoring.queries.NPlusOneMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -91,10 +97,17 @@ WSGI_APPLICATION = 'yatube.wsgi.application'
 # Database
 # https://docs.djangoproject.com/en/2.2/ref/settings/#databases
 
+# SQLite с WAL и PRAGMA для нескольких процессов (yatube/sqlite_backend).
+# Соединение живёт между запросами, поэтому PRAGMA не выполняются на
+# каждый запрос; timeout — сколько секунд писатель ждёт блокировку.
 DATABASES = {
     'default': {
-        'ENGINE': 'django.db.backends.sqlite3',
+        'ENGINE': 'yatube.sqlite_backend',
         'NAME': os.path.join(BASE_DIR, 'db.sqlite3'),
+        'CONN_MAX_AGE': 60,
+        'OPTIONS': {
+            'timeout': 5,
+        },
     }
 }
 
@@ -117,6 +130,17 @@ AUTH_PASSWORD_VALIDATORS = [
     },
 ]
 
+# Пользователь сессии читается из кэша, а не из auth_user. ModelBackend
+# оставлен, чтобы сессии, открытые до его появления, не разлогинились.
+AUTHENTICATION_BACKENDS = [
+    'users.backends.CachedModelBackend',
+    'django.contrib.auth.backends.ModelBackend',
+]
+USER_CACHE_TIMEOUT = 60 * 60
+
+# Сессии читаются из кэша, а пишутся и в кэш, и в базу: выход
+# и смена пароля удаляют их из обоих мест.
+SESSION_ENGINE = 'django.contrib.sessions.backends.cached_db'
 
 # Internationalization
 # https://docs.djangoproject.com/en/2.2/topics/i18n/
@@ -136,7 +160,11 @@ USE_TZ = True
 # https://docs.djangoproject.com/en/2.2/howto/static-files/
 
 STATIC_URL = '/static/'
-STATIC_ROOT = os.path.join(BASE_DIR, 'static')
+# Исходники статики лежат в static/, collectstatic собирает их
+# в staticfiles/ с хэшем в именах и копиями .gz рядом.
+STATICFILES_DIRS = [os.path.join(BASE_DIR, 'static')]
+STATIC_ROOT = os.path.join(BASE_DIR, 'staticfiles')
+STATICFILES_STORAGE = 'yatube.staticfiles.CompressedManifestStaticFilesStorage'
 
 MEDIA_URL = '/media/'
 MEDIA_ROOT = os.path.join(BASE_DIR, 'media')
@@ -149,8 +177,47 @@ LOGOUT_REDIRECT_URL = "index"
 EMAIL_BACKEND = "django.core.mail.backends.filebased.EmailBackend"
 EMAIL_FILE_PATH = os.path.join(BASE_DIR, "sent_emails")
 
+# Кэш в файле SQLite общий для всех воркеров на хосте. Тесты берут
+# свой файл (yatube/test_runner.py).
 CACHES = {
     'default': {
-        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'BACKEND': 'yatube.cache_backends.SQLiteCache',
+        'LOCATION': os.environ.get('YATUBE_CACHE_PATH',
+                                   os.path.join(BASE_DIR, 'cache.sqlite3')),
+        'OPTIONS': {
+            'MAX_ENTRIES': 100000,
+        },
     }
 }
+
+# Время жизни закэшированных страниц ленты. Ключи версионируются,
+# так что таймаут лишь ограничивает память под старые версии.
+FEED_CACHE_TIMEOUT = 60 * 15
+# Время жизни отрендеренных карточек постов (includes/post_card.html).
+POST_CARD_CACHE_TIMEOUT = 60 * 60 * 24
+
+# Проверки запросов: N+1 и бюджеты view из urls.py. 'log' пишет
+# нарушения в лог, 'raise' превращает их в ошибку, 'off' отключает.
+QUERY_CHECKS = os.environ.get('YATUBE_QUERY_CHECKS', 'log')
+# Каталог, в который каждый процесс пишет свои метрики; /metrics/
+# складывает метрики всех процессов.
+METRICS_DIR = os.environ.get('YATUBE_METRICS_DIR',
+                             os.path.join(BASE_DIR, 'metrics'))
+# Сколько запросов одной формы за ответ считать признаком N+1.
+NPLUSONE_THRESHOLD = 3
+
+# Наибольшая сторона загруженной картинки после обработки, пикселей.
+POST_IMAGE_MAX_SIZE = 2048
+
+# Кэш страниц index, group_posts и profile целиком: анонимам отдаётся
+# готовая страница в gzip, остальным — общий каркас, в котором заново
+# рисуются только фрагменты пользователя.
+PAGE_CACHE = True
+PAGE_CACHE_TIMEOUT = 60 * 10
+
+# Потоки, в которых генерируются миниатюры загруженных картинок.
+# 0 — не генерировать в фоне (только явным вызовом generate()).
+THUMBNAIL_WORKERS = 2
+
+# Тесты переопределяют часть настроек (yatube/test_runner.py).
+TEST_RUNNER = 'yatube.test_runner.TestRunner'
@@ -0,0 +1,36 @@
+from django.db.backends.sqlite3 import base
+
+# Настройки, которые SQLite не хранит в файле базы и которые поэтому
+# нужно задавать каждому новому соединению (кроме journal_mode: WAL
+# сохраняется в файле, но повторная установка ничего не стоит).
+# WAL: читатели не ждут писателя, а писатель — читателей.
+# synchronous=NORMAL: в режиме WAL fsync только при checkpoint, база
+# не портится при сбое, теряются лишь последние транзакции при
+# отключении питания.
+# cache_size в КиБ (отрицательное значение), mmap_size — в байтах.
+PRAGMAS = {
+    'journal_mode': 'WAL',
+    'synchronous': 'NORMAL',
+    'cache_size': -64000,
+    'mmap_size': 256 * 1024 * 1024,
+    'temp_store': 'MEMORY',
+}
+
+
+class DatabaseWrapper(base.DatabaseWrapper):
+    """
+    SQLite для нескольких процессов и потоков: WAL и PRAGMA из PRAGMAS
+    (их можно переопределить в OPTIONS['pragmas']) на каждом новом
+    соединении. Ожидание чужой блокировки задаётся OPTIONS['timeout'].
+    """
+
+    def get_connection_params(self):
+        params = super().get_connection_params()
+        self.pragmas = {**PRAGMAS, **params.pop('pragmas', {})}
+        return params
+
+    def get_new_connection(self, conn_params):
+        connection = super().get_new_connection(conn_params)
+        for name, value in self.pragmas.items():
+            connection.execute(f'PRAGMA {name} = {value}')
+        return connection
@@ -0,0 +1,113 @@
+import gzip
+import logging
+import posixpath
+
+from django.conf import settings
+from django.contrib.staticfiles.storage import (ManifestStaticFilesStorage,
+                                                staticfiles_storage)
+from django.core.files.base import ContentFile
+from django.http import Http404, HttpResponseNotFound
+from django.utils.cache import patch_cache_control, patch_vary_headers
+from django.utils.functional import cached_property
+from django.views import static
+
+logger = logging.getLogger(__name__)
+
+# Что имеет смысл сжимать: картинки и шрифты уже сжаты.
+COMPRESSIBLE = ('.css', '.js', '.map', '.svg', '.txt', '.json', '.xml',
+                '.html', '.eot', '.ttf', '.ico')
+# Копию .gz пишем, только если она заметно меньше исходного файла.
+MIN_RATIO = 0.95
+# Файлы с хэшем в имени никогда не меняются: браузер не перепроверяет их.
+IMMUTABLE_MAX_AGE = 60 * 60 * 24 * 365
+# Файлы без хэша (например, запрошенные по старой ссылке) живут недолго.
+PLAIN_MAX_AGE = 60 * 60
+
+
+class CompressedManifestStaticFilesStorage(ManifestStaticFilesStorage):
+    """
+    Статика с хэшем содержимого в имени (через manifest) и готовыми
+    копиями .gz, которые collectstatic пишет рядом с хэшированными
+    файлами, чтобы не сжимать их на каждый запрос.
+    """
+
+    def stored_name(self, name):
+        try:
+            return super().stored_name(name)
+        except ValueError:
+            # Файла нет в manifest: collectstatic не запускали или файл
+            # не собран. При разработке ссылка без хэша, на сайте это
+            # ошибка сборки, которую нельзя прятать.
+            logger.warning('Файла %s нет в manifest статики', name)
+            if not settings.DEBUG:
+                raise
+            return name
+
+    def post_process(self, paths, dry_run=False, **options):
+        processed_files = super().post_process(paths, dry_run, **options)
+        for name, hashed_name, processed in processed_files:
+            if (not dry_run and hashed_name
+                    and not isinstance(processed, Exception)
+                    and hashed_name.lower().endswith(COMPRESSIBLE)):
+                self.compress(hashed_name)
+            yield name, hashed_name, processed
+
+    def compress(self, name):
+        with self.open(name) as original:
+            data = original.read()
+        compressed = gzip.compress(data, compresslevel=9, mtime=0)
+        target = name + '.gz'
+        if self.exists(target):
+            self.delete(target)
+        if len(compressed) < len(data) * MIN_RATIO:
+            self._save(target, ContentFile(compressed))
+
+    @cached_property
+    def immutable_names(self):
+        return frozenset(self.hashed_files.values())
+
+
+def serve(request, path):
+    """
+    Отдаёт файл из STATIC_ROOT: готовую копию .gz, если клиент её
+    принимает, и заголовок immutable для имён с хэшем из manifest.
+    """
+    path = posixpath.normpath(path).lstrip('/')
+    name = path
+    accepts_gzip = 'gzip' in request.META.get('HTTP_ACCEPT_ENCODING', '')
+    if accepts_gzip and staticfiles_storage.exists(path + '.gz'):
+        # Тип и Content-Encoding serve() угадывает по имени x.css.gz.
+        name = path + '.gz'
+    response = static.serve(request, name,
+                            document_root=settings.STATIC_ROOT)
+    patch_vary_headers(response, ['Accept-Encoding'])
+    immutable = getattr(staticfiles_storage, 'immutable_names', ())
+    if path in immutable:
+        patch_cache_control(response, public=True, immutable=True,
+                            max_age=IMMUTABLE_MAX_AGE)
+    else:
+        patch_cache_control(response, public=True, max_age=PLAIN_MAX_AGE)
+    return response
+
+
+class StaticFilesMiddleware:
+    """
+    Отдаёт STATIC_ROOT через serve() до остальных middleware: копии .gz
+    и immutable для имён с хэшем работают и без отдельного веб-сервера
+    перед Django. На неизвестный файл — короткий 404 без страницы сайта
+    и запросов к базе.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.prefix = settings.STATIC_URL
+
+    def __call__(self, request):
+        path = request.path_info
+        if (request.method in ('GET', 'HEAD')
+                and path.startswith(self.prefix)):
+            try:
+                return serve(request, path[len(self.prefix):])
+            except Http404:
+                return HttpResponseNotFound()
+        return self.get_response(request)
@@ -0,0 +1,47 @@
+import os
+import shutil
+import tempfile
+
+from django.test import override_settings
+from django.test.runner import DiscoverRunner
+
+
+def test_settings(directory):
+    """
+    Настройки, которые тесты переопределяют поверх settings.py.
+    Тесты самих бэкендов включают рабочие значения через override_settings.
+    """
+    return {
+        # Тот же SQLiteCache, но в своём файле: тесты очищают кэш
+        # и не должны видеть сессии и страницы сайта.
+        'CACHES': {
+            'default': {
+                'BACKEND': 'yatube.cache_backends.SQLiteCache',
+                'LOCATION': os.path.join(directory, 'cache.sqlite3'),
+            },
+        },
+        # Тесты не запускают collectstatic, а без manifest {% static %}
+        # не найдёт хэшированных имён.
+        'STATICFILES_STORAGE': (
+            'django.contrib.staticfiles.storage.StaticFilesStorage'),
+        # Ответ из кэша страниц не несёт response.context.
+        'PAGE_CACHE': False,
+        # Метрики прошлых запусков и сайта не попадают в тесты.
+        'METRICS_DIR': os.path.join(directory, 'metrics'),
+        'QUERY_CHECKS': 'raise',
+        # Фоновый поток писал бы в тестовую базу во время её очистки.
+        'THUMBNAIL_WORKERS': 0,
+    }
+
+
+class TestRunner(DiscoverRunner):
+    def setup_test_environment(self, **kwargs):
+        super().setup_test_environment(**kwargs)
+        self.directory = tempfile.mkdtemp()
+        self.settings = override_settings(**test_settings(self.directory))
+        self.settings.enable()
+
+    def teardown_test_environment(self, **kwargs):
+        self.settings.disable()
+        shutil.rmtree(self.directory, ignore_errors=True)
+        super().teardown_test_environment(**kwargs)
@@ -0,0 +1,209 @@
+import gzip
+import multiprocessing
+import os
+import shutil
+import tempfile
+
+from django.contrib.auth import get_user_model
+from django.contrib.staticfiles.storage import staticfiles_storage
+from django.core.files.base import ContentFile
+from django.core.files.storage import FileSystemStorage
+from django.core.management import call_command
+from django.db import connection
+from django.test import SimpleTestCase, TestCase, override_settings
+from django.urls import reverse
+
+from yatube.cache_backends import SQLiteCache
+from yatube.sqlite_backend.base import DatabaseWrapper
+from yatube.staticfiles import CompressedManifestStaticFilesStorage
+
+
+def _increment(location, times):
+    cache = SQLiteCache(location, {})
+    for _ in range(times):
+        cache.incr('counter')
+
+
+class SQLiteCacheTest(SimpleTestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.location = os.path.join(self.directory, 'cache.sqlite3')
+        self.cache = SQLiteCache(self.location, {})
+
+    def tearDown(self):
+        shutil.rmtree(self.directory, ignore_errors=True)
+
+    def test_set_get_delete(self):
+        self.cache.set('key', {'value': [1, 2]})
+        self.cache.set('number', 7)
+        self.assertEqual(self.cache.get('key'), {'value': [1, 2]})
+        self.assertEqual(self.cache.get_many(['key', 'number', 'missing']),
+                         {'key': {'value': [1, 2]}, 'number': 7})
+        self.cache.delete('key')
+        self.assertIsNone(self.cache.get('key'))
+
+    def test_add_and_expiry(self):
+        self.assertTrue(self.cache.add('key', 'first'))
+        self.assertFalse(self.cache.add('key', 'second'))
+        self.assertEqual(self.cache.get('key'), 'first')
+        self.cache.set('expired', 'value', timeout=0)
+        self.assertFalse(self.cache.has_key('expired'))
+        self.assertTrue(self.cache.add('expired', 'fresh'))
+        self.assertEqual(self.cache.get('expired'), 'fresh')
+
+    def test_incr(self):
+        self.cache.set('counter', 1)
+        self.assertEqual(self.cache.incr('counter', 5), 6)
+        with self.assertRaises(ValueError):
+            self.cache.incr('missing')
+
+    def test_incr_is_atomic_across_processes(self):
+        """Инкремент из нескольких процессов не теряет обновлений."""
+        self.cache.set('counter', 0)
+        context = multiprocessing.get_context('fork')
+        workers = [context.Process(target=_increment,
+                                   args=(self.location, 50))
+                   for _ in range(4)]
+        for worker in workers:
+            worker.start()
+        for worker in workers:
+            worker.join()
+        self.assertEqual(self.cache.get('counter'), 200)
+
+    def test_file_readable_only_by_owner(self):
+        """Файл кэша с сессиями создаётся в своём каталоге с правами 0600."""
+        location = os.path.join(self.directory, 'var', 'cache.sqlite3')
+        SQLiteCache(location, {}).set('key', 'value')
+        self.assertEqual(os.stat(location).st_mode & 0o777, 0o600)
+
+    def test_cull_evicts_least_recently_used(self):
+        cache = SQLiteCache(self.location, {'OPTIONS': {
+            'MAX_ENTRIES': 10, 'CULL_FREQUENCY': 2,
+            'CULL_CHECK_INTERVAL': 1, 'TOUCH_INTERVAL': 0,
+        }})
+        for number in range(10):
+            cache.set(f'key{number}', number)
+        cache.get('key0')
+        cache.set('key10', 10)
+        self.assertEqual(cache.get('key0'), 0)
+        self.assertIsNone(cache.get('key1'))
+        self.assertLessEqual(len(cache.get_many(
+            [f'key{number}' for number in range(11)])), 10)
+
+
+CSS = b'body { color: red; }\n' * 50
+
+
+class CompressedManifestStaticFilesStorageTest(SimpleTestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        source = FileSystemStorage(os.path.join(self.directory, 'src'))
+        source.save('css/site.css', ContentFile(CSS))
+        source.save('img/logo.png', ContentFile(os.urandom(256)))
+        self.root = os.path.join(self.directory, 'root')
+        storage = CompressedManifestStaticFilesStorage(location=self.root)
+        paths = {}
+        for name in ('css/site.css', 'img/logo.png'):
+            with source.open(name) as content:
+                storage.save(name, content)
+            paths[name] = (source, name)
+        list(storage.post_process(paths))
+        self.settings = override_settings(
+            STATIC_ROOT=self.root, STATICFILES_STORAGE=(
+                'yatube.staticfiles.CompressedManifestStaticFilesStorage'))
+        self.settings.enable()
+
+    def tearDown(self):
+        self.settings.disable()
+        shutil.rmtree(self.directory, ignore_errors=True)
+
+    def test_hashed_css_is_served_gzipped_and_immutable(self):
+        url = staticfiles_storage.url('css/site.css')
+        self.assertRegex(url, r'^/static/css/site\.[0-9a-f]{12}\.css$')
+        response = self.client.get(url, HTTP_ACCEPT_ENCODING='gzip')
+        body = b''.join(response.streaming_content)
+        self.assertEqual(response['Content-Encoding'], 'gzip')
+        self.assertEqual(response['Content-Type'], 'text/css')
+        self.assertIn('immutable', response['Cache-Control'])
+        self.assertIn('Accept-Encoding', response['Vary'])
+        self.assertEqual(gzip.decompress(body), CSS)
+
+    def test_images_and_plain_names(self):
+        logo = staticfiles_storage.url('img/logo.png')
+        self.assertFalse(os.path.exists(
+            os.path.join(self.root, logo[len('/static/'):] + '.gz')))
+        response = self.client.get('/static/css/site.css')
+        self.assertNotIn('Content-Encoding', response)
+        self.assertNotIn('immutable', response['Cache-Control'])
+
+    def test_served_by_middleware_without_debug(self):
+        """Статика отдаётся и без DEBUG, неизвестный файл — 404."""
+        url = staticfiles_storage.url('img/logo.png')
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        self.assertIn('immutable', response['Cache-Control'])
+        self.assertEqual(self.client.get('/static/missing.js').status_code,
+                         404)
+
+    def test_missing_manifest_entry_fails_outside_debug(self):
+        with self.assertLogs('yatube.staticfiles', 'WARNING'):
+            with self.assertRaises(ValueError):
+                staticfiles_storage.url('missing.js')
+            with override_settings(DEBUG=True):
+                self.assertEqual(staticfiles_storage.url('missing.js'),
+                                 '/static/missing.js')
+
+
+class ManifestPagesTest(TestCase):
+    """Страницы с настоящим manifest после collectstatic."""
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.directory, ignore_errors=True)
+        source = FileSystemStorage(os.path.join(self.directory, 'src'))
+        # Файлы, на которые ссылается base.html.
+        for name in ('bootstrap/dist/css/bootstrap.min.css',
+                     'bootstrap/dist/js/bootstrap.min.js',
+                     'jquery/dist/jquery.min.js'):
+            source.save(name, ContentFile(CSS))
+        settings = override_settings(
+            STATICFILES_DIRS=[source.location],
+            STATICFILES_FINDERS=[
+                'django.contrib.staticfiles.finders.FileSystemFinder'],
+            STATIC_ROOT=os.path.join(self.directory, 'root'),
+            STATICFILES_STORAGE=(
+                'yatube.staticfiles.CompressedManifestStaticFilesStorage'))
+        settings.enable()
+        self.addCleanup(settings.disable)
+        call_command('collectstatic', interactive=False, verbosity=0)
+
+    def test_pages_link_hashed_static(self):
+        get_user_model().objects.create_user(username='Author')
+        for url in (reverse('index'),
+                    reverse('profile', kwargs={'username': 'Author'})):
+            with self.subTest(url=url):
+                response = self.client.get(url)
+                self.assertEqual(response.status_code, 200)
+                self.assertRegex(
+                    response.content.decode(),
+                    r'/static/bootstrap/dist/css/'
+                    r'bootstrap\.min\.[0-9a-f]{12}\.css')
+
+
+class SQLiteBackendTest(SimpleTestCase):
+    def test_pragmas_are_set_on_new_connections(self):
+        directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, directory, ignore_errors=True)
+        wrapper = DatabaseWrapper({
+            **connection.settings_dict,
+            'NAME': os.path.join(directory, 'db.sqlite3'),
+            'OPTIONS': {'timeout': 1, 'pragmas': {'cache_size': -1000}},
+        })
+        self.addCleanup(wrapper.close)
+        with wrapper.cursor() as cursor:
+            pragmas = {}
+            for name in ('journal_mode', 'synchronous', 'cache_size'):
+                cursor.execute(f'PRAGMA {name}')
+                pragmas[name] = cursor.fetchone()[0]
+        self.assertEqual(pragmas, {'journal_mode': 'wal', 'synchronous': 1,
+                                   'cache_size': -1000})
@@ -11,15 +11,16 @@ urlpatterns = [
     path("auth/", include("users.urls")),
     path("auth/", include("django.contrib.auth.urls")),
     path("admin/", admin.site.urls),
+    path("api/v1/", include("api.urls", namespace="api")),
+    path("metrics/", include("monitoring.urls", namespace="monitoring")),
     path("", include("posts.urls")),
     path('about/', include('about.urls', namespace='about')),
 ]
 
+# Статику отдаёт yatube.staticfiles.StaticFilesMiddleware.
 if settings.DEBUG:
     urlpatterns += static(settings.MEDIA_URL,
                           document_root=settings.MEDIA_ROOT)
-    urlpatterns += static(settings.STATIC_URL,
-                          document_root=settings.STATIC_ROOT)
     import debug_toolbar
 
     urlpatterns += (path("__debug__/", include(debug_toolbar.urls)),)